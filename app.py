@@ -1,3 +1,6 @@
+from helper_functions.importtiming import enable_import_timing, mark_startup_complete
+enable_import_timing()  # must run before the other imports so they are timed
+
 import streamlit as st
 from PIL import Image
 import base64
@@ -7,6 +10,7 @@ import logging
 from streamlit.components.v1 import html
 from helper_functions.logauth import log_auth_action
 
+mark_startup_complete()
 
 # for streamlit cloud compatibility
 # __import__('pysqlite3')
@@ -153,6 +157,7 @@ def main_app_page():
     methodology = st.Page("pages/5_🔬_Methodology.py", title="Methodology (Admin Only)")
     troubleshooting = st.Page("pages/6_🛠️_Troubleshooting.py", title="Troubleshooting")
     companydirectory = st.Page("pages/8_📂_CompanyDirectory.py", title="Company Directory")
+    analytics = st.Page("pages/9_📊_Analytics.py", title="Query Analytics (Admin Only)")
     
     # Show navigation only when logged in
     #if st.user.is_logged_in or 'user' in st.session_state:
@@ -174,13 +179,16 @@ def main_app_page():
         )
        
     elif 'user' in st.session_state:
+        # Keep the analytics dataset current; imported here so other logins do not pay for pyarrow
+        from helper_functions.historyanalytics import start_compaction_scheduler
+        start_compaction_scheduler()
         pg = st.navigation(
             {
                 #"Account": [logout_page],
                 # "Reports": [dashboard, bugs, alerts],
                 "Tools": [search, searchhistory, companydirectory],
                 "Info": [about, methodology],
-                "Admin": [webscraping, troubleshooting]
+                "Admin": [webscraping, troubleshooting, analytics]
             }
         )
     pg.run()
@@ -0,0 +1,167 @@
+"""Offline retrieval benchmark and quality/latency regression check.
+
+Loads a fixture company set into a throwaway Chroma index (same sync code as
+create_vector_db, with fake embeddings), replays a labelled query set through
+the RAG retrieval path and reports recall@k, MRR, p50/p95 retrieval latency and
+prompt/answer token counts. No network is needed.
+
+    python -m benchmarks.retrieval_bench
+    python -m benchmarks.retrieval_bench --chunk-size 500 --k 6 --reranker none
+    python -m benchmarks.retrieval_bench --output bench.json
+    python -m benchmarks.retrieval_bench --baseline bench.json   # exit 1 on regression
+"""
+import os
+
+# Offline defaults, set before any module reads them
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+
+from benchmarks.fakes import FakeEmbeddings, approx_tokens, fake_answer
+from logics import rag
+from logics.rerank import CrossEncoderReranker, FeatureReranker, NoopReranker
+from logics.vectordb import CHUNK_SIZE, sync_collection
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+RERANKERS = {
+    "feature": FeatureReranker,
+    "none": NoopReranker,
+    "cross-encoder": CrossEncoderReranker,
+}
+# Allowed drop before --baseline reports a regression
+QUALITY_TOLERANCE = 0.02        # recall@k and MRR, absolute
+TOKEN_TOLERANCE = 0.10          # mean prompt tokens, relative
+
+
+def load_json(path: str):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def token_counter() -> Callable[[str], int]:
+    """tiktoken via helper_functions.llm when its encoding can be loaded, else an estimate"""
+    try:
+        from helper_functions.llm import count_tokens
+        count_tokens("probe")
+        return count_tokens
+    except Exception as e:
+        print(f"tiktoken unavailable ({e}); token counts are estimates", file=sys.stderr)
+        return approx_tokens
+
+
+def result_names(docs) -> List[str]:
+    """Company names in rank order, one entry per company"""
+    names = []
+    for doc in docs:
+        name = doc.metadata.get("name")
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def run(companies: List[Dict], queries: List[Dict], k: int, overfetch: int, chunk_size: int,
+        reranker_name: str) -> Dict:
+    embeddings = FakeEmbeddings()
+    reranker = RERANKERS[reranker_name]()
+    count = token_counter()
+    index_dir = tempfile.mkdtemp(prefix="retrieval-bench-")
+    try:
+        vectordb = Chroma(persist_directory=index_dir, collection_name="benchmark", embedding_function=embeddings)
+        start = time.perf_counter()
+        stats, lexical = sync_collection(vectordb, companies, embeddings.embed_documents, chunk_size=chunk_size)
+        build_seconds = time.perf_counter() - start
+
+        latencies, recalls, reciprocal_ranks, prompt_tokens, answer_tokens, misses = [], [], [], [], [], []
+        embedding_free = 0
+        for item in queries:
+            query, relevant = item["query"], set(item["relevant"])
+            calls_before = embeddings.calls
+            start = time.perf_counter()
+            docs = rag.retrieve(vectordb, query, k=k, lexical=lexical, reranker=reranker, overfetch=overfetch)
+            latencies.append(time.perf_counter() - start)
+
+            names = result_names(docs)[:k]
+            recalls.append(len(relevant & set(names)) / len(relevant))
+            rank = next((i for i, name in enumerate(names, start=1) if name in relevant), None)
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+            if not rank:
+                misses.append({"query": query, "expected": sorted(relevant), "got": names})
+
+            prompt = rag.build_prompt(query, docs)
+            prompt_tokens.append(count(prompt))
+            answer_tokens.append(count(fake_answer(prompt)))
+            embedding_free += embeddings.calls == calls_before
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    return {
+        "config": {"k": k, "overfetch": overfetch, "chunk_size": chunk_size, "reranker": reranker_name,
+                   "companies": stats["companies"], "queries": len(queries)},
+        "index_build_seconds": build_seconds,
+        "documents_embedded": stats["embedded_documents"],
+        f"recall@{k}": float(np.mean(recalls)),
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "latency_p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "latency_p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "prompt_tokens_mean": float(np.mean(prompt_tokens)),
+        "answer_tokens_mean": float(np.mean(answer_tokens)),
+        "queries_without_embedding_call": embedding_free,
+        "misses": misses,
+    }
+
+
+def compare(report: Dict, baseline: Dict) -> List[str]:
+    """Regressions of `report` against a saved baseline (empty list if none)"""
+    problems = []
+    k = report["config"]["k"]
+    for metric in (f"recall@{k}", "mrr"):
+        if metric in baseline and report[metric] < baseline[metric] - QUALITY_TOLERANCE:
+            problems.append(f"{metric} dropped from {baseline[metric]:.3f} to {report[metric]:.3f}")
+    if report["prompt_tokens_mean"] > baseline["prompt_tokens_mean"] * (1 + TOKEN_TOLERANCE):
+        problems.append(f"prompt tokens grew from {baseline['prompt_tokens_mean']:.0f} "
+                        f"to {report['prompt_tokens_mean']:.0f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", default=os.path.join(FIXTURES_DIR, "companies.json"))
+    parser.add_argument("--queries", default=os.path.join(FIXTURES_DIR, "queries.json"))
+    parser.add_argument("--k", type=int, default=rag.RETRIEVER_K)
+    parser.add_argument("--overfetch", type=int, default=rag.RETRIEVAL_OVERFETCH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--reranker", choices=sorted(RERANKERS), default="feature")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare with a saved report and exit 1 on regression")
+    args = parser.parse_args()
+
+    report = run(load_json(args.companies), load_json(args.queries), args.k, args.overfetch,
+                 args.chunk_size, args.reranker)
+    for key, value in report.items():
+        if key not in ("config", "misses"):
+            print(f"{key:32} {value:.3f}" if isinstance(value, float) else f"{key:32} {value}")
+    for miss in report["misses"]:
+        print(f"miss: {miss['query']!r} expected {miss['expected']} got {miss['got']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        problems = compare(report, load_json(args.baseline))
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
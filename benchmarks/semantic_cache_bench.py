@@ -0,0 +1,125 @@
+"""Benchmark the local semantic cache without OpenAI or Redis.
+
+Run from the repository root:
+
+    python -m benchmarks.semantic_cache_bench --entries 2000 --probes 1000
+
+Queries are embedded with a deterministic hashing embedder, so runs are
+repeatable and cost nothing. Paraphrase probes should hit, unrelated probes
+should miss; the report shows hit latency, hit rate and false-hit rate.
+"""
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from helper_functions.cache import LocalSemanticCache
+
+DIMENSIONS = 1536
+
+SECTORS = ["retail", "logistics", "healthcare", "finance", "education", "manufacturing",
+           "hospitality", "construction", "legal", "insurance", "real estate", "food services"]
+NEEDS = ["chatbot", "data analytics platform", "cybersecurity audit", "cloud migration",
+         "inventory forecasting", "document OCR", "customer CRM", "payroll automation",
+         "video surveillance analytics", "e-commerce website", "IoT sensor monitoring",
+         "fraud detection", "scheduling system", "AI recommendation engine"]
+TEMPLATES = ["Which vendors can build a {need} for a {sector} company?",
+             "Recommend companies offering {need} solutions in {sector}",
+             "I run a {sector} business and need a {need}"]
+UNRELATED = ["What time is it in Tokyo?", "Best durian stalls in Geylang",
+             "How do I renew my passport?", "Weather forecast for the weekend",
+             "Explain the offside rule in football", "Translate good morning into Malay"]
+
+
+def fake_embed(text: str) -> List[float]:
+    """Hash word unigrams and bigrams into a fixed-size vector"""
+    words = text.lower().replace("?", "").replace(",", "").split()
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.md5(feature.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], "little") % DIMENSIONS
+        vector[index] += 1.0 if digest[4] % 2 else -1.0
+    return vector.tolist()
+
+
+def paraphrase(query: str, rng: random.Random) -> str:
+    """Cheap paraphrase: change case, punctuation and add a filler word"""
+    filler = rng.choice(["please", "kindly", "urgently", "quickly"])
+    return f"{query.rstrip('?').upper() if rng.random() < 0.5 else query.rstrip('?')} {filler}"
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return float(np.percentile(samples, q)) * 1000 if samples else 0.0
+
+
+def run(entries: int, probes: int, capacity: int, threshold: float, seed: int, persist: bool):
+    rng = random.Random(seed)
+    stored = [
+        f"{rng.choice(TEMPLATES).format(need=rng.choice(NEEDS), sector=rng.choice(SECTORS))} #{i}"
+        for i in range(entries)
+    ]
+
+    persist_dir = tempfile.mkdtemp() if persist else None
+    cache = LocalSemanticCache(
+        name="bench", similarity_threshold=threshold, ttl=None, capacity=capacity, embed_fn=fake_embed,
+        persist_path=os.path.join(persist_dir, "bench") if persist_dir else None,
+    )
+
+    start = time.perf_counter()
+    for query in stored:
+        cache.store(query, f"response for {query}")
+    store_seconds = time.perf_counter() - start
+
+    # Only the most recent `capacity` entries can still be in the cache
+    resident = stored[-capacity:]
+    lookups = [(paraphrase(rng.choice(resident), rng), True) for _ in range(probes // 2)]
+    lookups += [(f"{rng.choice(UNRELATED)} #{i}", False) for i in range(probes - len(lookups))]
+    rng.shuffle(lookups)
+
+    hit_latencies, miss_latencies = [], []
+    true_hits = false_hits = expected_hits = 0
+    for query, should_hit in lookups:
+        start = time.perf_counter()
+        hits = cache.check(query)
+        elapsed = time.perf_counter() - start
+        (hit_latencies if hits else miss_latencies).append(elapsed)
+        expected_hits += should_hit
+        true_hits += bool(hits) and should_hit
+        false_hits += bool(hits) and not should_hit
+
+    if persist_dir:
+        start = time.perf_counter()
+        cache.save()
+        save_seconds = time.perf_counter() - start
+        reloaded = LocalSemanticCache(name="bench", similarity_threshold=threshold, ttl=None,
+                                      capacity=capacity, embed_fn=fake_embed, persist_path=cache.persist_path)
+        print(f"persisted {len(cache)} entries in {save_seconds * 1000:.1f} ms, reloaded {len(reloaded)}")
+
+    print(f"entries stored        {entries} (capacity {capacity}, resident {len(cache)})")
+    print(f"store throughput      {entries / store_seconds:,.0f} / s")
+    print(f"lookups               {len(lookups)}")
+    print(f"hit latency p50/p95   {percentile(hit_latencies, 50):.3f} / {percentile(hit_latencies, 95):.3f} ms")
+    print(f"miss latency p50/p95  {percentile(miss_latencies, 50):.3f} / {percentile(miss_latencies, 95):.3f} ms")
+    print(f"hit rate (paraphrase) {true_hits / max(expected_hits, 1):.1%}")
+    print(f"false hits (unrelated) {false_hits / max(len(lookups) - expected_hits, 1):.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--probes", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--persist", action="store_true", help="also time save/reload to disk")
+    args = parser.parse_args()
+    run(args.entries, args.probes, args.capacity, args.threshold, args.seed, args.persist)
+
+
+if __name__ == "__main__":
+    main()
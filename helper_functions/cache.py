@@ -1,25 +1,417 @@
 import os
-import streamlit as st
-from crewai import Agent, Task, Crew
-from dotenv import load_dotenv
-from st_oauth import st_google_oauth
-from redisvl.extensions.cache.llm import SemanticCache
-from redisvl.utils.vectorize import OpenAIVectorizer
-        
+import atexit
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from helper_functions.embedcache import get_embedding_cache
+
+try:
+    from redisvl.extensions.cache.llm import SemanticCache
+    from redisvl.query.filter import Tag
+    from redisvl.utils.vectorize import OpenAIVectorizer
+except ImportError:  # redisvl is optional; the semantic tier is skipped without it
+    SemanticCache = None
+    Tag = None
+    OpenAIVectorizer = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration (override through environment variables)
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 24 * 60 * 60))         # seconds
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512))   # exact-match tier
+SEMANTIC_CACHE_SIMILARITY = float(os.getenv("SEMANTIC_CACHE_SIMILARITY", 0.92))  # cosine similarity for a hit
+SEMANTIC_CACHE_MODEL = "text-embedding-3-large"
+SEMANTIC_CACHE_CAPACITY = int(os.getenv("SEMANTIC_CACHE_CAPACITY", 2000))         # local backend, LRU beyond this
+SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR")                              # local backend persists here if set
+SEMANTIC_CACHE_INITIAL_ROWS = 64                                                  # local backend grows from here
+
+
+if OpenAIVectorizer is not None:
+    class CachedOpenAIVectorizer(OpenAIVectorizer):
+        """OpenAIVectorizer that reuses vectors from the shared local embedding cache"""
+
+        def embed(self, text, preprocess=None, as_buffer=False, **kwargs):
+            return self.embed_many([text], preprocess=preprocess, as_buffer=as_buffer, **kwargs)[0]
+
+        def embed_many(self, texts, preprocess=None, batch_size=10, as_buffer=False, **kwargs):
+            if preprocess:
+                texts = [preprocess(t) for t in texts]
+            vectors = get_embedding_cache().embed(
+                self.model, texts,
+                lambda missing: super(CachedOpenAIVectorizer, self).embed_many(missing, batch_size=batch_size, **kwargs)
+            )
+            if as_buffer:
+                dtype = getattr(self, "dtype", "float32")
+                return [np.asarray(v, dtype=dtype).tobytes() for v in vectors]
+            return vectors
+
+
+# Persistent local caches still in use; saved by one exit hook, so a cache that has
+# been replaced (e.g. after an index swap) is garbage collected instead of kept alive
+_persistent_caches: "weakref.WeakSet[LocalSemanticCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _save_persistent_caches():
+    for cache in list(_persistent_caches):
+        try:
+            cache.save()
+        except Exception as e:
+            logger.warning(f"Failed to save semantic cache {cache.name}: {str(e)}")
+
+
+def _openai_embed(text: str) -> Sequence[float]:
+    from helper_functions.llm import get_embedding
+    return get_embedding(text, model=SEMANTIC_CACHE_MODEL)[0]
+
+
+class LocalSemanticCache:
+    """In-process semantic cache with the same check/store interface as redisvl's SemanticCache.
+
+    Cached query embeddings live in one L2-normalised NumPy matrix, so a lookup is a
+    single matrix-vector product. The matrix starts small and doubles as entries are
+    added, up to `capacity`, beyond which entries are evicted LRU. Each entry can
+    carry a `scope` (e.g. the search filters); a lookup only matches entries with
+    the same scope. The cache can optionally be saved to `persist_path` (.npz for
+    vectors, .json for text).
+    """
+
+    def __init__(self, name: str = "crewai_cache", similarity_threshold: float = SEMANTIC_CACHE_SIMILARITY,
+                 ttl: Optional[int] = RESPONSE_CACHE_TTL, capacity: int = SEMANTIC_CACHE_CAPACITY,
+                 embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+                 persist_path: Optional[str] = None, autosave_every: int = 50):
+        self.name = name
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self.embed_fn = embed_fn or _openai_embed
+        self.persist_path = persist_path
+        self.autosave_every = autosave_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._reset()
+        if persist_path:
+            self._load()
+            _persistent_caches.add(self)
+
+    def _reset(self):
+        self._vectors: Optional[np.ndarray] = None   # (allocated rows <= capacity, dim) float32
+        self._stored_at = np.zeros(self.capacity)
+        self._last_used = np.zeros(self.capacity)
+        self._prompts: List[str] = []
+        self._responses: List[str] = []
+        self._scopes: List[str] = []
+
+    def __len__(self):
+        return len(self._prompts)
+
+    def _grow(self, rows: int, dim: int):
+        """Make room for at least `rows` vectors, doubling the matrix (lock held)"""
+        allocated = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= allocated:
+            return
+        size = min(self.capacity, max(rows, SEMANTIC_CACHE_INITIAL_ROWS, allocated * 2))
+        vectors = np.zeros((size, dim), dtype=np.float32)
+        if allocated:
+            vectors[:allocated] = self._vectors
+        self._vectors = vectors
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def check(self, query: str, scope: str = "") -> List[Dict]:
+        """Closest cached entry in `scope` above the similarity threshold, as a one-item list (or [])"""
+        vector = self._embed(query)
+        with self._lock:
+            n = len(self._prompts)
+            if n == 0:
+                self.misses += 1
+                return []
+            similarities = self._vectors[:n] @ vector
+            similarities[np.asarray(self._scopes) != scope] = -np.inf
+            if self.ttl is not None:
+                expired = time.time() - self._stored_at[:n] > self.ttl
+                similarities[expired] = -np.inf
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.similarity_threshold:
+                self.misses += 1
+                return []
+            self.hits += 1
+            self._last_used[best] = time.time()
+            return [{
+                "prompt": self._prompts[best],
+                "response": self._responses[best],
+                "scope": self._scopes[best],
+                "vector_distance": 1 - similarity,
+            }]
+
+    def store(self, query: str, response: str, scope: str = ""):
+        vector = self._embed(query)
+        now = time.time()
+        with self._lock:
+            n = len(self._prompts)
+            existing = next((i for i in range(n) if self._prompts[i] == query and self._scopes[i] == scope), None)
+            if existing is not None:
+                slot = existing
+            elif n < self.capacity:
+                slot = n
+                self._grow(n + 1, vector.shape[0])
+                self._prompts.append(query)
+                self._responses.append(response)
+                self._scopes.append(scope)
+            else:
+                # Evict the least recently used entry
+                slot = int(np.argmin(self._last_used[:n]))
+            self._vectors[slot] = vector
+            self._prompts[slot] = query
+            self._responses[slot] = response
+            self._scopes[slot] = scope
+            self._stored_at[slot] = now
+            self._last_used[slot] = now
+            self._unsaved += 1
+            autosave = self.persist_path and self._unsaved >= self.autosave_every
+        if autosave:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._unsaved = 0
+        if self.persist_path:
+            for suffix in (".npz", ".json"):
+                try:
+                    os.remove(self.persist_path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def save(self):
+        """Write the cache to disk (no-op without persist_path)"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            n = len(self._prompts)
+            if self._vectors is None:
+                return
+            os.makedirs(os.path.dirname(self.persist_path) or '.', exist_ok=True)
+            with open(self.persist_path + ".npz.tmp", "wb") as f:
+                np.savez(f, vectors=self._vectors[:n], stored_at=self._stored_at[:n],
+                         last_used=self._last_used[:n])
+            with open(self.persist_path + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump({"prompts": self._prompts, "responses": self._responses, "scopes": self._scopes},
+                          f, ensure_ascii=False)
+            os.replace(self.persist_path + ".npz.tmp", self.persist_path + ".npz")
+            os.replace(self.persist_path + ".json.tmp", self.persist_path + ".json")
+            self._unsaved = 0
+
+    def _load(self):
+        try:
+            arrays = np.load(self.persist_path + ".npz")
+            with open(self.persist_path + ".json", encoding="utf-8") as f:
+                text = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable semantic cache {self.persist_path}: {str(e)}")
+            return
+        n = min(len(text["prompts"]), self.capacity)
+        if n == 0:
+            return
+        vectors = arrays["vectors"][:n]
+        self._grow(n, vectors.shape[1])
+        self._vectors[:n] = vectors
+        self._stored_at[:n] = arrays["stored_at"][:n]
+        self._last_used[:n] = arrays["last_used"][:n]
+        self._prompts = text["prompts"][:n]
+        self._responses = text["responses"][:n]
+        self._scopes = (text.get("scopes") or [""] * n)[:n]
+        logger.info(f"Loaded {n} semantic cache entries from {self.persist_path}")
+
+
 # --- Redis Cache Setup ---
 class RecommendationCache:
-    def __init__(self):
-        self.cache = SemanticCache(
-            name="crewai_cache",
-            redis_url=os.getenv("REDIS_URL"),
-            vectorizer=OpenAIVectorizer(
-                model="text-embedding-3-large",
-                api_key=os.getenv("OPENAI_API_KEY")
+    """Semantic response cache: redisvl SemanticCache when REDIS_URL is set,
+    otherwise the in-process LocalSemanticCache"""
+
+    def __init__(self, name: str = "crewai_cache", similarity_threshold: float = SEMANTIC_CACHE_SIMILARITY,
+                 ttl: Optional[int] = RESPONSE_CACHE_TTL):
+        if os.getenv("REDIS_URL") and SemanticCache is not None:
+            self.cache = SemanticCache(
+                name=name,
+                redis_url=os.getenv("REDIS_URL"),
+                distance_threshold=1 - similarity_threshold,  # redisvl uses cosine distance
+                ttl=ttl,
+                filterable_fields=[{"name": "scope", "type": "tag"}],
+                vectorizer=CachedOpenAIVectorizer(
+                    model=SEMANTIC_CACHE_MODEL,
+                    api_key=os.getenv("OPENAI_API_KEY")
+                )
+            )
+        else:
+            persist_path = os.path.join(SEMANTIC_CACHE_DIR, name) if SEMANTIC_CACHE_DIR else None
+            self.cache = LocalSemanticCache(
+                name=name, similarity_threshold=similarity_threshold, ttl=ttl, persist_path=persist_path
             )
-        )
-    
-    def check(self, query: str):
-        return self.cache.check(query)
-    
-    def store(self, query: str, response: str):
-        self.cache.store(query, response)
\ No newline at end of file
+
+    def check(self, query: str, scope: str = ""):
+        """Closest entry stored with the same `scope` (e.g. a filters key)"""
+        if isinstance(self.cache, LocalSemanticCache):
+            return self.cache.check(query, scope=scope)
+        return self.cache.check(prompt=query, filter_expression=Tag("scope") == scope)
+
+    def store(self, query: str, response: str, scope: str = ""):
+        if isinstance(self.cache, LocalSemanticCache):
+            self.cache.store(query, response, scope=scope)
+        else:
+            self.cache.store(prompt=query, response=response, filters={"scope": scope})
+
+    def clear(self):
+        self.cache.clear()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ExactMatchCache:
+    """In-process LRU of responses keyed by normalized query, with a TTL per entry"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: Optional[int] = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, query: str) -> Optional[str]:
+        key = (namespace, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, response = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, namespace: str, query: str, response: str):
+        key = (namespace, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.time(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache:
+    """Two-tier response cache in front of the RAG path and the deep search.
+
+    Tier 1 is an exact-match LRU in this process; tier 2 is the semantic
+    RecommendationCache (one per search mode and index version), backed by Redis
+    or by the local NumPy cache. Answers depend on the search filters, so the
+    filters key (`scope`) is part of the exact-match key and is stored with each
+    semantic entry. When a rebuilt vector index goes live, both tiers are cleared.
+    """
+
+    def __init__(self, similarity_threshold: float = SEMANTIC_CACHE_SIMILARITY,
+                 ttl: Optional[int] = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.exact = ExactMatchCache(max_entries=max_entries, ttl=ttl)
+        self._semantic: Dict[str, RecommendationCache] = {}
+        self._index_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _semantic_for(self, mode: str) -> Optional[RecommendationCache]:
+        """Semantic tier for a mode, or None if it could not be created"""
+        if mode not in self._semantic:
+            try:
+                # The index version is part of the name so entries from an older index are never served
+                self._semantic[mode] = RecommendationCache(
+                    name=f"jeron_{mode}_{self._index_version}",
+                    similarity_threshold=self.similarity_threshold, ttl=self.ttl
+                )
+            except Exception as e:
+                logger.warning(f"Semantic cache unavailable: {str(e)}")
+                return None
+        return self._semantic[mode]
+
+    def _sync_index_version(self, index_version: str):
+        """Drop everything cached against an older index (lock held)"""
+        if self._index_version == index_version:
+            return
+        if self._index_version is not None:
+            logger.info(f"Index version changed to {index_version}, invalidating response cache")
+            self.exact.clear()
+            for semantic in self._semantic.values():
+                try:
+                    semantic.clear()
+                except Exception as e:
+                    logger.warning(f"Failed to clear semantic cache: {str(e)}")
+            self._semantic = {}
+        self._index_version = index_version
+
+    def get(self, query: str, mode: str, index_version: str, semantic: bool = True,
+            scope: str = "all") -> Tuple[Optional[str], Optional[str]]:
+        """Return (response, tier) where tier is 'exact' or 'semantic', or (None, None) on a miss.
+        Pass semantic=False for queries that should not be embedded (keyword queries)."""
+        with self._lock:
+            self._sync_index_version(index_version)
+            semantic_cache = self._semantic_for(mode) if semantic else None
+
+        namespace = f"{mode}:{scope}"
+        response = self.exact.get(namespace, query)
+        if response is not None:
+            return response, "exact"
+
+        if semantic_cache is not None:
+            try:
+                hits = semantic_cache.check(query, scope=scope)
+                if hits:
+                    response = hits[0]["response"]
+                    self.exact.put(namespace, query, response)
+                    return response, "semantic"
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {str(e)}")
+        return None, None
+
+    def put(self, query: str, mode: str, index_version: str, response: str, semantic: bool = True,
+            scope: str = "all"):
+        with self._lock:
+            self._sync_index_version(index_version)
+            semantic_cache = self._semantic_for(mode) if semantic else None
+        self.exact.put(f"{mode}:{scope}", query, response)
+        if semantic_cache is not None:
+            try:
+                semantic_cache.store(query, response, scope=scope)
+            except Exception as e:
+                logger.warning(f"Semantic cache store failed: {str(e)}")
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache shared by every Streamlit session"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+EMBEDDING_CACHE_PATH = "./data/embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024  # evict least recently used vectors beyond this
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"  # langchain OpenAIEmbeddings default
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk embedding cache keyed by (model, sha256(text)) with size-based LRU eviction.
+
+    Vectors are stored as float32 blobs in SQLite. The connection is shared across
+    threads behind a lock, so one instance can serve every Streamlit session.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up cached vectors; missing entries come back as None"""
+        hashes = [text_hash(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found]
+                )
+                self._conn.commit()
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((model, text_hash(text), blob, len(blob), now))
+        with self._lock:
+            for model_, h, _, nbytes, _ in rows:
+                previous = self._conn.execute(
+                    "SELECT nbytes FROM embeddings WHERE model = ? AND text_hash = ?", (model_, h)
+                ).fetchone()
+                self._total_bytes += nbytes - (previous[0] if previous else 0)
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used vectors until the cache fits in max_bytes (lock held)"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT model, text_hash, nbytes FROM embeddings ORDER BY last_used LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for model, h, nbytes in rows:
+                self._conn.execute("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", (model, h))
+                self._total_bytes -= nbytes
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def embed(self, model: str, texts: Sequence[str],
+              embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """Return vectors for `texts`, calling `embed_fn` only for the ones not cached yet"""
+        texts = list(texts)
+        vectors = self.get_many(model, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            fresh = dict(zip(missing, embed_fn(missing)))
+            self.put_many(model, list(fresh), list(fresh.values()))
+            vectors = [v if v is not None else fresh[t] for t, v in zip(texts, vectors)]
+        return vectors
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache shared by every embedding path"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings wrapper that serves repeated texts from the shared cache"""
+
+    def __init__(self, underlying: Embeddings, model: Optional[str] = None,
+                 cache: Optional[EmbeddingCache] = None):
+        self.underlying = underlying
+        self.model = model or getattr(underlying, "model", None) or DEFAULT_EMBEDDING_MODEL
+        self.cache = cache or get_embedding_cache()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.cache.embed(self.model, texts, self.underlying.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.cache.embed(self.model, [text], lambda missing: [self.underlying.embed_query(missing[0])])[0]
+
+
+def cached_openai_embeddings(**kwargs) -> CachedEmbeddings:
+    """OpenAIEmbeddings behind the shared embedding cache"""
+    from langchain_community.embeddings import OpenAIEmbeddings
+    return CachedEmbeddings(OpenAIEmbeddings(**kwargs))
@@ -0,0 +1,262 @@
+# Columnar analytics over the query history.
+# A compaction job copies new rows from the SQLite history store into a Parquet
+# dataset partitioned by day (hive layout, typed columns, no response text). The
+# analytics functions scan only the partitions and columns they need, so the
+# dashboard stays fast as history grows. Runs on a schedule via
+# start_compaction_scheduler(), or from cron: python -m helper_functions.historyanalytics
+#
+# Parquet files are never rewritten. Deleting a search records its id in the
+# store's deleted_history table, and load_history drops those ids when it reads
+# the dataset, so deleted searches disappear from every dashboard immediately.
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from helper_functions.historystore import QUERY_HISTORY_DB
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+ANALYTICS_DIR = "./data/history_parquet"
+WATERMARK_FILE = "_watermark.json"      # highest history id already compacted
+COMPACTION_BATCH_ROWS = 50000
+COMPACTION_INTERVAL = 15 * 60           # seconds between scheduled compactions
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("user_email", pa.string()),
+    ("mode", pa.string()),
+    ("cache_hit", pa.string()),
+    ("response_time", pa.float64()),
+    ("first_token_time", pa.float64()),
+    ("query_chars", pa.int32()),
+    ("date", pa.string()),              # partition column, local date of the search
+])
+
+
+def _read_watermark(root: str) -> int:
+    try:
+        with open(os.path.join(root, WATERMARK_FILE), encoding="utf-8") as f:
+            return int(json.load(f)["last_id"])
+    except FileNotFoundError:
+        return 0
+
+
+def _write_watermark(root: str, last_id: int):
+    path = os.path.join(root, WATERMARK_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"last_id": last_id, "updated": datetime.now().isoformat()}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _rows_to_table(rows: List[tuple]) -> pa.Table:
+    """History rows (id, timestamp, user_email, mode, cache_hit, response_time,
+    first_token_time, query) to a typed Arrow table"""
+    columns: Dict[str, list] = {field.name: [] for field in SCHEMA}
+    for entry_id, timestamp, user_email, mode, cache_hit, response_time, first_token_time, query in rows:
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            continue  # unparseable legacy timestamp
+        columns["id"].append(entry_id)
+        columns["timestamp"].append(parsed)
+        columns["user_email"].append(user_email)
+        columns["mode"].append(mode)
+        columns["cache_hit"].append(cache_hit)
+        columns["response_time"].append(response_time)
+        columns["first_token_time"].append(first_token_time)
+        columns["query_chars"].append(len(query or ""))
+        columns["date"].append(parsed.date().isoformat())
+    return pa.table(columns, schema=SCHEMA)
+
+
+def _read_history(db_path: str, after_id: int, limit: Optional[int] = None) -> List[tuple]:
+    # A separate read-only connection, so compaction never holds the writer's lock
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        sql = ("SELECT id, timestamp, user_email, mode, cache_hit, response_time, first_token_time, query "
+               "FROM query_history WHERE id > ? ORDER BY id")
+        params: list = [after_id]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _read_deleted_ids(db_path: str) -> List[int]:
+    """Ids of deleted history entries (tombstones written by QueryHistoryStore.delete)"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return [row[0] for row in conn.execute("SELECT id FROM deleted_history")]
+    except sqlite3.OperationalError:
+        return []  # database created before deletions were recorded
+    finally:
+        conn.close()
+
+
+_compaction_lock = threading.Lock()
+
+
+def compact_history(db_path: str = QUERY_HISTORY_DB, root: str = ANALYTICS_DIR) -> int:
+    """Append history rows newer than the watermark to the Parquet dataset.
+    Returns the number of rows compacted. Safe to run repeatedly."""
+    if not os.path.exists(db_path):
+        return 0
+    with _compaction_lock:
+        os.makedirs(root, exist_ok=True)
+        last_id = _read_watermark(root)
+        total = 0
+        while True:
+            rows = _read_history(db_path, last_id, COMPACTION_BATCH_ROWS)
+            if not rows:
+                break
+            table = _rows_to_table(rows)
+            if table.num_rows:
+                # Each batch gets its own files, named by its first id, so nothing is rewritten
+                pq.write_to_dataset(
+                    table, root, partition_cols=["date"],
+                    basename_template=f"part-{rows[0][0]:012d}-{{i}}.parquet",
+                )
+            last_id = rows[-1][0]
+            _write_watermark(root, last_id)
+            total += len(rows)
+        if total:
+            logger.info(f"Compacted {total} history rows into {root} (up to id {last_id})")
+        return total
+
+
+def load_history(start: Optional[date] = None, end: Optional[date] = None,
+                 columns: Optional[List[str]] = None, root: str = ANALYTICS_DIR,
+                 db_path: str = QUERY_HISTORY_DB) -> pa.Table:
+    """History between `start` and `end` (inclusive local dates) as an Arrow table.
+
+    Day partitions outside the range are skipped without being read. Rows written
+    since the last compaction are read from SQLite, so results are current, and
+    deleted entries are left out.
+    """
+    columns = columns or [field.name for field in SCHEMA]
+    tables = []
+    if os.path.isdir(root) and any(name.startswith("date=") for name in os.listdir(root)):
+        dataset = ds.dataset(root, schema=SCHEMA, format="parquet", partitioning="hive")
+        condition = None
+        deleted = _read_deleted_ids(db_path) if os.path.exists(db_path) else []
+        if deleted:
+            condition = ~ds.field("id").isin(deleted)
+        if start is not None:
+            lower = ds.field("date") >= start.isoformat()
+            condition = lower if condition is None else condition & lower
+        if end is not None:
+            upper = ds.field("date") <= end.isoformat()
+            condition = upper if condition is None else condition & upper
+        tables.append(dataset.to_table(columns=columns, filter=condition))
+
+    if os.path.exists(db_path):
+        tail = _rows_to_table(_read_history(db_path, _read_watermark(root)))
+        if start is not None:
+            tail = tail.filter(pc.greater_equal(tail["date"], start.isoformat()))
+        if end is not None:
+            tail = tail.filter(pc.less_equal(tail["date"], end.isoformat()))
+        tables.append(tail.select(columns))
+
+    if not tables:
+        return SCHEMA.empty_table().select(columns)
+    return pa.concat_tables(tables)
+
+
+def latency_percentiles(table: pa.Table, column: str = "response_time") -> Dict[str, Optional[float]]:
+    """p50 and p95 of a duration column in seconds (missing values ignored)"""
+    values = pc.drop_null(table[column])
+    if len(values) == 0:
+        return {"p50": None, "p95": None}
+    p50, p95 = pc.quantile(values, q=[0.5, 0.95]).to_pylist()
+    return {"p50": p50, "p95": p95}
+
+
+def _count_by(table: pa.Table, keys: List[str]) -> pa.Table:
+    """Rows per distinct value of `keys`, as columns keys + ['queries']"""
+    counts = table.group_by(keys).aggregate([("id", "count")])
+    return counts.select(keys + ["id_count"]).rename_columns(keys + ["queries"])
+
+
+def volume_by_day(table: pa.Table) -> pa.Table:
+    return _count_by(table, ["date"]).sort_by("date")
+
+
+def volume_by_user_day(table: pa.Table) -> pa.Table:
+    return _count_by(table, ["date", "user_email"]).sort_by([("date", "descending"), ("queries", "descending")])
+
+
+def mode_mix(table: pa.Table) -> pa.Table:
+    """Searches per mode ('rag' / 'deep'); older entries without a mode count as 'unknown'"""
+    modes = pc.fill_null(table["mode"], "unknown")
+    return _count_by(pa.table({"mode": modes, "id": table["id"]}), ["mode"]).sort_by([("queries", "descending")])
+
+
+def cache_hit_rate(table: pa.Table) -> Dict[str, float]:
+    """Share of searches answered from the response cache, overall and per tier"""
+    if table.num_rows == 0:
+        return {"overall": 0.0}
+    # Only entries logged since the response cache existed record a cache outcome
+    tracked = table.filter(pc.is_valid(table["mode"]))
+    if tracked.num_rows == 0:
+        return {"overall": 0.0}
+    hits = tracked.filter(pc.is_valid(tracked["cache_hit"]))
+    rates = {"overall": hits.num_rows / tracked.num_rows}
+    for row in _count_by(hits, ["cache_hit"]).to_pylist():
+        rates[row["cache_hit"]] = row["queries"] / tracked.num_rows
+    return rates
+
+
+class CompactionScheduler:
+    """Daemon thread that runs compact_history every `interval` seconds"""
+
+    def __init__(self, interval: float = COMPACTION_INTERVAL):
+        self.interval = interval
+        self.last_run: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="history-compaction", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                compact_history()
+                self.last_run = time.time()
+            except Exception as e:
+                logger.error(f"History compaction failed: {str(e)}")
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+
+
+_scheduler: Optional[CompactionScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_compaction_scheduler() -> CompactionScheduler:
+    """Start the periodic compaction once per process (safe to call on every rerun)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = CompactionScheduler()
+        return _scheduler
+
+
+if __name__ == "__main__":
+    logger.info(f"Compacted {compact_history()} rows")
@@ -0,0 +1,191 @@
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+QUERY_HISTORY_DB = 'logs/query_history.sqlite3'
+LEGACY_HISTORY_CSV = 'logs/query_history.csv'     # imported once, then left untouched
+HISTORY_PAGE_SIZE = 20
+
+HISTORY_COLUMNS = ['timestamp', 'user_email', 'query', 'response', 'response_time',
+                   'first_token_time', 'mode', 'cache_hit']
+
+
+def to_seconds(value) -> Optional[float]:
+    """Durations arrive as timedeltas, numbers or pandas timedelta strings ('0 days 00:00:05.1')"""
+    if value is None or value == '':
+        return None
+    if hasattr(value, 'total_seconds'):
+        return value.total_seconds()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        import pandas as pd
+        seconds = pd.to_timedelta(value).total_seconds()
+        return None if seconds != seconds else seconds  # NaT
+    except (TypeError, ValueError):
+        return None
+
+
+def to_timestamp(value) -> str:
+    """ISO-8601 text, so timestamps with the same offset sort chronologically"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    import pandas as pd
+    return pd.Timestamp(value).isoformat()
+
+
+class QueryHistoryStore:
+    """Query history in SQLite (WAL mode), one row per search.
+
+    The connection is shared across threads behind a lock. Batches are written in
+    a single transaction, so readers never see half of a batch.
+    """
+
+    def __init__(self, path: str = QUERY_HISTORY_DB, legacy_csv: Optional[str] = LEGACY_HISTORY_CSV):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                user_email TEXT,
+                query TEXT,
+                response TEXT,
+                response_time REAL,
+                first_token_time REAL,
+                mode TEXT,
+                cache_hit TEXT
+            )
+        """)
+        # Serves one user's history newest first straight from the index, without a sort
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_history_user_time
+            ON query_history (user_email, timestamp DESC, id DESC)
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        # Ids of deleted entries, so analytics can drop rows it already copied to Parquet
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS deleted_history (
+                id INTEGER PRIMARY KEY,
+                deleted_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+        if legacy_csv:
+            self._import_legacy_csv(legacy_csv)
+
+    def _import_legacy_csv(self, csv_path: str):
+        """Copy the old CSV history in once; the meta flag stops it from being imported twice"""
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'legacy_csv_imported'").fetchone()
+        if done or not os.path.exists(csv_path):
+            return
+        import pandas as pd
+
+        legacy = pd.read_csv(csv_path)
+        legacy = legacy.reindex(columns=HISTORY_COLUMNS)
+        legacy = legacy.astype(object).where(legacy.notna(), None)
+        self.insert_many(legacy.to_dict('records'), meta={'legacy_csv_imported': csv_path})
+        logger.info(f"Imported {len(legacy)} history entries from {csv_path}")
+
+    def insert_many(self, entries: Sequence[Dict], meta: Optional[Dict[str, str]] = None):
+        """Insert a batch of entries (and optional meta flags) in one transaction"""
+        rows = [
+            (
+                to_timestamp(e['timestamp']), e.get('user_email'), e.get('query'),
+                None if e.get('response') is None else str(e.get('response')),
+                to_seconds(e.get('response_time')), to_seconds(e.get('first_token_time')),
+                e.get('mode'), e.get('cache_hit'),
+            )
+            for e in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO query_history (timestamp, user_email, query, response, response_time, "
+                "first_token_time, mode, cache_hit) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            for key, value in (meta or {}).items():
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _user_page_query(self, user_email: str, page_size: int,
+                         after: Optional[Tuple[str, int]]) -> Tuple[str, List]:
+        """SQL and parameters for one page of a user's entries (one row extra to detect the last page)"""
+        sql = "SELECT id, " + ", ".join(HISTORY_COLUMNS) + " FROM query_history WHERE user_email = ?"
+        params: List = [user_email]
+        if after is not None:
+            # The leading `timestamp <= ?` bound lets SQLite seek in the index instead of
+            # scanning every newer entry of the user
+            sql += " AND timestamp <= ? AND (timestamp < ? OR id < ?)"
+            params += [after[0], after[0], after[1]]
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(page_size + 1)
+        return sql, params
+
+    def user_page(self, user_email: str, page_size: int = HISTORY_PAGE_SIZE,
+                  after: Optional[Tuple[str, int]] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """One page of a user's entries, newest first, using keyset pagination.
+
+        `after` is the (timestamp, id) cursor returned with the previous page, so each
+        page is an index range scan no matter how deep the user pages.
+        Returns the entries and the cursor for the next page (None on the last page).
+        """
+        sql, params = self._user_page_query(user_email, page_size, after)
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, (rows[-1]['timestamp'], rows[-1]['id'])
+
+    def user_count(self, user_email: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM query_history WHERE user_email = ?", (user_email,)
+            ).fetchone()[0]
+
+    def delete(self, entry_id: int, user_email: str) -> bool:
+        """Delete one entry; only its owner can delete it. The id is kept as a tombstone."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM query_history WHERE id = ? AND user_email = ?", (entry_id, user_email)
+            )
+            deleted = cursor.rowcount > 0
+            if deleted:
+                self._conn.execute("INSERT OR IGNORE INTO deleted_history (id, deleted_at) VALUES (?, ?)",
+                                   (entry_id, datetime.now().isoformat()))
+        return deleted
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM query_history").fetchone()[0]
+
+
+_store: Optional[QueryHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> QueryHistoryStore:
+    """Process-wide history store shared by every Streamlit session"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QueryHistoryStore()
+        return _store
@@ -0,0 +1,129 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Set IMPORT_TIMING=0 to switch the import hook off
+IMPORT_TIMING_ENABLED = os.getenv("IMPORT_TIMING", "1") != "0"
+
+
+def _process_started_at() -> float:
+    """Wall-clock start of this process, so startup time includes the imports Streamlit
+    does before the app script runs. psutil when installed, else /proc on Linux."""
+    try:
+        import psutil
+        return psutil.Process().create_time()
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/stat", encoding="utf-8") as f:
+            # Fields after the ")" closing the command name; starttime is the 20th of them
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="utf-8") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        logger.warning("Process start time unavailable; startup time is measured from this import")
+        return time.time()
+
+
+PROCESS_STARTED_AT = _process_started_at()
+
+# module name -> (cumulative seconds, self seconds)
+_timings: Dict[str, Tuple[float, float]] = {}
+_local = threading.local()
+_startup_seconds = None
+
+
+class _ImportTimer:
+    """Meta path finder that times each module's first execution, like `python -X importtime`.
+
+    It delegates finding to the other finders and only wraps the exec_module of the
+    loader instance it gets back, so module and loader types are left untouched.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        # Class-level loaders (builtins, frozen modules) are shared and cheap; skip them
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+
+        original = getattr(loader.exec_module, "__wrapped__", loader.exec_module)
+
+        def exec_module(module):
+            stack = _local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                original(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                _timings[fullname] = (elapsed, elapsed - children)
+
+        exec_module.__wrapped__ = original
+        try:
+            loader.exec_module = exec_module
+        except AttributeError:
+            pass
+        return spec
+
+
+def enable_import_timing():
+    """Install the import hook once per process (safe to call on every Streamlit rerun)"""
+    if IMPORT_TIMING_ENABLED and not any(isinstance(f, _ImportTimer) for f in sys.meta_path):
+        sys.meta_path.insert(0, _ImportTimer())
+
+
+def mark_startup_complete():
+    """Record cold-start time (process start to the app's first completed imports) once"""
+    global _startup_seconds
+    if _startup_seconds is not None:
+        return
+    _startup_seconds = time.time() - PROCESS_STARTED_AT
+    top = ", ".join(f"{row['package']} {row['self_seconds']:.2f}s" for row in package_report()[:10])
+    logger.info(f"Cold start took {_startup_seconds:.2f}s; heaviest packages: {top}")
+
+
+def startup_seconds():
+    return _startup_seconds
+
+
+def module_report(limit: int = 50) -> List[Dict]:
+    """Slowest modules by cumulative import time"""
+    rows = [
+        {"module": name, "cumulative_seconds": cumulative, "self_seconds": self_time}
+        for name, (cumulative, self_time) in _timings.items()
+    ]
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:limit]
+
+
+def package_report() -> List[Dict]:
+    """Import cost per top-level package (sum of self time of its modules)"""
+    totals: Dict[str, List] = {}
+    for name, (_, self_time) in _timings.items():
+        package = name.split(".")[0]
+        entry = totals.setdefault(package, [0.0, 0])
+        entry[0] += self_time
+        entry[1] += 1
+    rows = [{"package": p, "self_seconds": t, "modules": n} for p, (t, n) in totals.items()]
+    rows.sort(key=lambda row: row["self_seconds"], reverse=True)
+    return rows
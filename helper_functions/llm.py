@@ -1,24 +1,41 @@
 import os
+import functools
 import streamlit as st
 from dotenv import load_dotenv
-from openai import OpenAI
-import tiktoken
+from helper_functions.embedcache import get_embedding_cache
 
-if load_dotenv('.env'):
-    # for local development
+if load_dotenv('.env') or os.getenv('OPENAI_API_KEY'):
+    # for local development, or a key already set in the environment (CI, benchmarks)
     OPENAI_KEY = os.getenv('OPENAI_API_KEY')
 else:
     OPENAI_KEY = st.secrets['OPENAI_API_KEY']
 
-# Pass the API Key to the OpenAI Client
-client = OpenAI(api_key=OPENAI_KEY)
+@functools.lru_cache(maxsize=1)
+def get_client():
+    """OpenAI client, created on first use"""
+    from openai import OpenAI
+    # Pass the API Key to the OpenAI Client
+    return OpenAI(api_key=OPENAI_KEY)
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model='gpt-4o-mini'):
+    """tiktoken encoding, loaded once on first use"""
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
 
 def get_embedding(input, model='text-embedding-3-small'):
-    response = client.embeddings.create(
-        input=input,
-        model=model
-    )
-    return [x.embedding for x in response.data]
+    texts = [input] if isinstance(input, str) else list(input)
+
+    def embed_missing(missing):
+        response = get_client().embeddings.create(
+            input=missing,
+            model=model
+        )
+        return [x.embedding for x in response.data]
+
+    # Texts embedded before with the same model are served from the local cache
+    return get_embedding_cache().embed(model, texts, embed_missing)
 
 # This is the "Updated" helper function for calling LLM
 def get_completion(prompt, model="gpt-4o-mini", temperature=0, top_p=1.0, max_tokens=1024, n=1, json_output=False):
@@ -28,7 +45,7 @@ def get_completion(prompt, model="gpt-4o-mini", temperature=0, top_p=1.0, max_to
       output_json_structure = None
 
     messages = [{"role": "user", "content": prompt}]
-    response = client.chat.completions.create( #originally was openai.chat.completions
+    response = get_client().chat.completions.create( #originally was openai.chat.completions
         model=model,
         messages=messages,
         temperature=temperature,
@@ -42,7 +59,7 @@ def get_completion(prompt, model="gpt-4o-mini", temperature=0, top_p=1.0, max_to
 
 # Note that this function directly take in "messages" as the parameter.
 def get_completion_by_messages(messages, model="gpt-4o-mini", temperature=0, top_p=1.0, max_tokens=1024, n=1):
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model=model,
         messages=messages,
         temperature=temperature,
@@ -56,11 +73,11 @@ def get_completion_by_messages(messages, model="gpt-4o-mini", temperature=0, top
 # ⚠️ This is simplified implementation that is good enough for a rough estimation
 
 def count_tokens(text):
-    encoding = tiktoken.encoding_for_model('gpt-4o-mini')
+    encoding = get_encoding('gpt-4o-mini')
     return len(encoding.encode(text))
 
 
 def count_tokens_from_message(messages):
-    encoding = tiktoken.encoding_for_model('gpt-4o-mini')
+    encoding = get_encoding('gpt-4o-mini')
     value = ' '.join([x.get('content') for x in messages])
     return len(encoding.encode(value))
\ No newline at end of file
@@ -0,0 +1,160 @@
+import atexit
+import csv
+import glob
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl  # POSIX only; other platforms rely on the in-process lock
+except ImportError:
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+LOG_MAX_BYTES = 5 * 1024 * 1024     # rotate the active file beyond this size
+LOG_FLUSH_INTERVAL = 2.0            # seconds between background flushes
+LOG_MAX_BUFFER = 100                # flush early once this many rows are waiting
+
+
+class RotatingCsvLog:
+    """Append-only CSV log with buffered background flushing and rotation.
+
+    Rows are queued in memory and appended by a daemon thread, so callers never
+    wait on the disk. Each flush appends to the active file under a lock (and an
+    OS file lock where available). When the active file grows past `max_bytes`,
+    or was last written on an earlier day, it is renamed to a timestamped segment
+    and a new file is started. Nothing is ever rewritten.
+    """
+
+    def __init__(self, path: str, fieldnames: List[str], max_bytes: int = LOG_MAX_BYTES,
+                 rotate_daily: bool = True, flush_interval: float = LOG_FLUSH_INTERVAL,
+                 max_buffer: int = LOG_MAX_BUFFER):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict] = []
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, row: Dict):
+        """Queue one row; it reaches the file within `flush_interval` seconds"""
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.max_buffer
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error writing to log file {self.path}: {str(e)}")
+
+    def flush(self):
+        """Append every queued row to the active file"""
+        with self._buffer_lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+        with self._file_lock:
+            self._rotate_if_needed()
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerows(rows)
+                    f.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _rotate_if_needed(self):
+        """Rename the active file to a timestamped segment if it is too big or too old (lock held)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        too_big = stat.st_size >= self.max_bytes
+        too_old = self.rotate_daily and datetime.fromtimestamp(stat.st_mtime).date() < datetime.now().date()
+        if not (too_big or too_old):
+            return
+        stem, ext = os.path.splitext(self.path)
+        segment = f"{stem}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+        os.replace(self.path, segment)
+        logger.info(f"Rotated {self.path} to {segment}")
+
+    def close(self):
+        """Stop the background thread and write what is left (runs at exit)"""
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def segments(self) -> List[str]:
+        """Rotated segments and the active file, newest first"""
+        stem, ext = os.path.splitext(self.path)
+        rotated = sorted(glob.glob(f"{glob.escape(stem)}.*{ext}"), reverse=True)
+        return ([self.path] if os.path.exists(self.path) else []) + rotated
+
+    def iter_rows(self, newest_first: bool = True) -> Iterator[Dict]:
+        """Stream rows across segments, holding at most one segment in memory"""
+        segments = self.segments() if newest_first else list(reversed(self.segments()))
+        for segment in segments:
+            try:
+                # The lock keeps a flush from appending while the segment is read
+                with self._file_lock, open(segment, newline='', encoding='utf-8') as f:
+                    rows = list(csv.DictReader(f))
+            except FileNotFoundError:
+                continue  # rotated away since segments() was listed
+            yield from (reversed(rows) if newest_first else rows)
+
+    def read_page(self, page: int = 0, page_size: int = 100) -> List[Dict]:
+        """One page of rows, newest first"""
+        start = page * page_size
+        rows = []
+        for i, row in enumerate(self.iter_rows()):
+            if i >= start + page_size:
+                break
+            if i >= start:
+                rows.append(row)
+        return rows
+
+
+_logs: Dict[str, RotatingCsvLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_csv_log(path: str, fieldnames: List[str], **kwargs) -> RotatingCsvLog:
+    """Process-wide writer per log file, shared by every Streamlit session"""
+    with _logs_lock:
+        if path not in _logs:
+            _logs[path] = RotatingCsvLog(path, fieldnames, **kwargs)
+        return _logs[path]
+
+
+def segment_label(path: str) -> Optional[str]:
+    """Rotation timestamp of a segment, or None for the active file"""
+    parts = os.path.basename(path).split('.')
+    return parts[1] if len(parts) > 2 else None
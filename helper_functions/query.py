@@ -1,9 +1,12 @@
-import os
+import atexit
+import queue
+import threading
 import streamlit as st
 import logging
-import pandas as pd
 from datetime import datetime, timezone
+from typing import Optional
 from pytz import timezone as tz
+from helper_functions.historystore import get_history_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,53 +23,134 @@ singapore_tz = tz('Asia/Singapore')
 
 # Call save_history() after modifications
 
-def save_query_to_csv(query_data: dict):
-    """Save a single query entry to CSV file"""
-    try:
-        # Convert to DataFrame
-        df = pd.DataFrame([query_data])
-        
-        # Write to CSV (append mode if file exists)
-        df.to_csv('logs/query_history.csv', 
-                 mode='a', 
-                 header=not os.path.exists('logs/query_history.csv'), 
-                 index=False)
-        logger.info("Query saved to CSV")
-    except Exception as e:
-        logger.error(f"Error saving query to CSV: {str(e)}")
-        st.error("Failed to save query history")
+# Configuration
+HISTORY_QUEUE_SIZE = 1000           # entries waiting for the writer before log_query blocks
+HISTORY_BATCH_SIZE = 100            # entries written per transaction
+HISTORY_FLUSH_INTERVAL = 1.0        # seconds the writer waits for more entries before writing
+HISTORY_PUT_TIMEOUT = 0.5           # seconds log_query waits on a full queue before writing itself
+
+
+class QueryHistoryWriter:
+    """Background writer between the search page and the history store.
+
+    log_query only puts the entry on a bounded queue; a daemon thread collects
+    entries into batches and writes each batch in one SQLite transaction. The
+    queue is drained at interpreter exit, so entries are not lost on shutdown.
+    """
+
+    def __init__(self, store=None, maxsize: int = HISTORY_QUEUE_SIZE, batch_size: int = HISTORY_BATCH_SIZE,
+                 flush_interval: float = HISTORY_FLUSH_INTERVAL):
+        self.store = store or get_history_store()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="query-history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, entry: dict):
+        try:
+            self._queue.put(entry, timeout=HISTORY_PUT_TIMEOUT)
+        except queue.Full:
+            # Writer is falling behind; write this one directly rather than drop it
+            logger.warning("Query history queue full, writing entry synchronously")
+            self.store.insert_many([entry])
+
+    def _take_batch(self, timeout: float):
+        batch = [self._queue.get(timeout=timeout)]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.store.insert_many(batch)
+            logger.info(f"Saved {len(batch)} queries to history")
+        except Exception as e:
+            logger.error(f"Error saving query history: {str(e)}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                batch = self._take_batch(self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(batch)
+
+    def flush(self):
+        """Block until every queued entry has been written"""
+        if self._thread.is_alive():
+            self._queue.join()
+            return
+        while True:
+            try:
+                batch = self._take_batch(0)
+            except queue.Empty:
+                return
+            self._write(batch)
+
+    def close(self):
+        """Stop the writer and write what is still queued (runs at exit)"""
+        self._stopped.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+_writer: Optional[QueryHistoryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_history_writer() -> QueryHistoryWriter:
+    """Process-wide history writer shared by every Streamlit session"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = QueryHistoryWriter()
+        return _writer
+
 
 # Modify your log_query function to use this:
-def log_query(query: str, response: str, response_time: float):
-    # logger.info(f"Logging query: {query}")
-    # logger.info(f"Logging response: {response}")
-    # logger.info(f"Response time: {response_time}s")
-    """Log query and response to history and CSV"""
+def log_query(query: str, response: str, response_time, first_token_time: float = None, mode: str = None,
+              cache_hit: str = None):
+    """Log query and response to the query history store.
+
+    Args:
+        response_time: total time until the answer was complete
+        first_token_time: seconds until the first streamed token (RAG answers only)
+        mode: 'rag' or 'deep'
+        cache_hit: response cache tier that served the answer ('exact'/'semantic'), None if not cached
+    """
     if st.user.is_logged_in:
-        new_entry = {
-            'timestamp': datetime.now(singapore_tz),
-            'user_email': st.user.email,
-            'query': query,
-            'response': response,
-            'response_time': response_time
-        }
+        user_email = st.user.email
     else:
-        new_entry = {
-            'timestamp': datetime.now(singapore_tz),
-            'user_email': st.session_state.user['email'],
-            'query': query,
-            'response': response,
-            'response_time': response_time
-        }
-    
-    # Add to session state
-    # st.session_state.query_history = pd.concat([
-    #     st.session_state.query_history,
-    #     pd.DataFrame([new_entry])
-    # ], ignore_index=True)
+        user_email = st.session_state.user['email']
+
+    new_entry = {
+        'timestamp': datetime.now(singapore_tz),
+        'user_email': user_email,
+        'query': query,
+        'response': response,
+        'response_time': response_time,
+        'first_token_time': first_token_time,
+        'mode': mode,
+        'cache_hit': cache_hit
+    }
     
-    # Save to CSV
-    save_query_to_csv(new_entry)
+    # Written in the background, off the search request
+    try:
+        get_history_writer().submit(new_entry)
+        # The history page waits for the writer only when this session has something pending
+        st.session_state.history_unflushed = True
+    except Exception as e:
+        logger.error(f"Error queueing query history: {str(e)}")
+        st.error("Failed to save query history")
 
 # def delete_query(timestamp):
 #     """Delete query from history"""
@@ -1,33 +1,21 @@
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
 from crewai import Agent, Task, Crew
-from crewai.tools import tool
-from tavily import TavilyClient
-from langchain_community.vectorstores import Chroma
 import logging
-from langchain_community.embeddings import OpenAIEmbeddings
+from logics.rag import retrieve
+from logics.vectorindex import get_vectordb
+from logics.webresearch import format_findings, research_companies
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # for streamlit cloud compatibility
 # __import__('pysqlite3')
 # import sys
 # sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
 
-# Initialize Tavily client
-@tool
-def tavily_search(query: str) -> str:
-    """Search the internet for current information using Tavily API.
-    Ideal for finding company data, market trends, and competitor analysis.
-    Returns comprehensive results with sources."""
-    tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-    results = tavily.search(query=query, search_depth="basic")
-    return str(results["results"])  # Return formatted results
-
-# Load your existing vector database
-vectordb = Chroma(
-    persist_directory="./imda_vectordb",
-    collection_name="imda_accred_companies",
-    embedding_function=OpenAIEmbeddings()
-)
-
 # 1. Research Agent - Finds relevant companies from vector DB
 # portfolio_agent = Agent(
 #     role="Tech Analaysis Specialist",
@@ -56,15 +44,7 @@ portfolio_agent = Agent(
         "similarity_threshold": 0.8  # Minimum match score
     }
 )
-# 2. Web Researcher Agent - Gathers additional online information
-web_researcher = Agent(
-    role="Web Research Specialist",
-    goal="Find additional information about companies from public sources",
-    backstory="Skilled at finding up-to-date information about companies from various online sources",
-    verbose=True,
-    tools=[tavily_search],
-    allow_delegation=False
-)
+# 2. Web research runs as per-company search jobs in logics.webresearch (no agent needed)
 
 # 3. Management Consultant Agent - Bridges technical and business perspectives
 consultant_agent = Agent(
@@ -92,9 +72,7 @@ def company_search(company_data: str, use_case: str):
          Available company data: {company_data}
         """,
         agent=portfolio_agent,
-        expected_output="Shortlist above 80% relevancy match score companies with their key details from the IMDA database",
-        async_execution=True,
-        context=[]
+        expected_output="Shortlist above 80% relevancy match score companies with their key details from the IMDA database"
     )
 # def company_search(company_data: str, use_case: str):
 #     """Enhanced task for semantic company matching"""
@@ -134,20 +112,17 @@ def company_search(company_data: str, use_case: str):
 #         async_execution=True,
 #         context=[]
 #     )
-def web_research_task(company_info: str):
-    """Task to gather additional online information"""
-    return Task(
-        description=f"Find recent information about this company: {company_info}",
-        agent=web_researcher,
-        expected_output="Updated information about the company's products, news, and recent developments",
-        async_execution=True,
-        context=[]
-    )
-
 def consultant_task(company_data: str, web_findings: str):
-    """Task to analyze and present findings"""
+    """Task to analyze and present findings (takes the outputs of the two research branches)"""
     return Task(
-        description="Analyze the company data and web findings to create an executive summary",
+        description=f"""Analyze the company data and web findings to create an executive summary
+
+        Shortlisted companies:
+        {company_data}
+
+        Web findings:
+        {web_findings}
+        """,
         agent=consultant_agent,
         expected_output="""
         A concise report of recommended IMDA companies with: 
@@ -160,37 +135,69 @@ def consultant_task(company_data: str, web_findings: str):
             7) Website URL Link from IMDA directory
             
         You may include additional insight that offer relevant technologies beneficial to the user. Just indicate the Company Name and Website URL Link only.
-        """,
-        context=[company_data, web_findings]
+        """
     )
 
-def analyze_use_case(use_case: str):
-    """Orchestrate the multi-agent analysis"""
-    # First find relevant companies from vector DB
-    docs = vectordb.similarity_search(use_case, k=5)
+def _run_task(agent: Agent, task: Task) -> str:
+    """Run one task in its own single-agent crew"""
+    crew = Crew(agents=[agent], tasks=[task], verbose=True)
+    return str(crew.kickoff())
+
+
+def _timed(timings: Dict[str, float], stage: str, fn: Callable[[], str]) -> str:
+    start = time.monotonic()
+    try:
+        return fn()
+    finally:
+        timings[stage] = time.monotonic() - start
+        logger.info(f"Deep search stage '{stage}' took {timings[stage]:.1f}s")
+
+
+def run_deep_search(use_case: str, filters: Optional[Dict] = None) -> Tuple[str, Dict[str, float]]:
+    """Deep research orchestrator.
+
+    The vector shortlist and the web research only depend on the retrieved companies,
+    so they run concurrently and fan in to the consultant step. End-to-end time is
+    close to the slowest branch plus the consultant, not the sum of all stages.
+    `filters` narrows the retrieved companies (see logics.filters).
+    Returns the report and the seconds spent per stage.
+    """
+    timings: Dict[str, float] = {}
+    start = time.monotonic()
+
+    # First find relevant companies from the lexical and vector indexes
+    docs = _timed(timings, "retrieval",
+                  lambda: retrieve(get_vectordb(), use_case, k=5, filters=filters))
     company_info = "\n".join([doc.page_content for doc in docs])
-    #logger.info(f"Company_info type: {type(company_info)}")
-    #logger.info(f"company info: {company_info}")
     
     # Extract company names from metadata
     company_names = [doc.metadata['name'] for doc in docs if 'name' in doc.metadata]
-    #logger.info(f"Found companies: {company_names}")
-    
-    # # Create tasks
-    research_task = company_search(company_info, use_case)
-    web_task = web_research_task(company_names)
-    #logger.info(f"web_task type: {type(web_task)}")
-    consult_task = consultant_task(research_task, web_task)
-    
-    # # Assemble crew
-    crew = Crew(
-        agents=[portfolio_agent, web_researcher, consultant_agent],
-        tasks=[research_task, web_task, consult_task],
-        verbose=True
-    )
-    
-    # # Execute
-    result = crew.kickoff()
+    logger.info(f"Found companies: {company_names}")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        shortlist_future = executor.submit(
+            _timed, timings, "shortlist",
+            lambda: _run_task(portfolio_agent, company_search(company_info, use_case))
+        )
+        # Per-company searches fan out inside this branch with their own concurrency cap
+        web_future = executor.submit(
+            _timed, timings, "web_research",
+            lambda: format_findings(research_companies(company_names))
+        )
+        shortlist = shortlist_future.result()
+        web_findings = web_future.result()
+
+    result = _timed(timings, "consultant",
+                    lambda: _run_task(consultant_agent, consultant_task(shortlist, web_findings)))
+
+    timings["total"] = time.monotonic() - start
+    logger.info(f"Deep search finished in {timings['total']:.1f}s: {timings}")
+    return result, timings
+
+
+def analyze_use_case(use_case: str):
+    """Orchestrate the multi-agent analysis"""
+    result, _ = run_deep_search(use_case)
     return result
 
 # Example usage
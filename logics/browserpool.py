@@ -0,0 +1,159 @@
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# selenium and webdriver_manager are imported on first use so that importing the
+# scraper (or a run that never needs a browser) does not pay for them
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+DRIVER_POOL_SIZE = 2            # headless browsers started per scrape run
+DRIVER_MAX_PAGES = 25           # recycle a browser after this many pages
+DRIVER_CHECKOUT_TIMEOUT = 120   # seconds to wait for a free browser
+
+
+@functools.lru_cache(maxsize=1)
+def get_driver_path() -> str:
+    """Resolve the chromedriver binary once per process"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    logger.info(f"Resolved chromedriver at {path}")
+    return path
+
+
+def new_headless_driver():
+    """Start a headless Chrome using the cached driver binary"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(service=Service(get_driver_path()), options=options)
+
+
+class DriverPool:
+    """Fixed-size pool of headless browsers shared by page-extraction workers.
+
+    Use as a context manager so every browser is shut down when the run ends:
+
+        with DriverPool(size=2) as pool:
+            with pool.driver() as driver:
+                driver.get(url)
+    """
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE, max_pages_per_driver: int = DRIVER_MAX_PAGES,
+                 lazy: bool = False):
+        self.size = max(1, size)
+        self.max_pages_per_driver = max_pages_per_driver
+        self.lazy = lazy
+        self._idle = queue.Queue()
+        self._page_counts = {}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._closed = True
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def start(self):
+        """Start all browsers in parallel"""
+        with self._start_lock:
+            if self._started:
+                return
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                drivers = list(executor.map(lambda _: new_headless_driver(), range(self.size)))
+            for driver in drivers:
+                self._page_counts[id(driver)] = 0
+                self._idle.put(driver)
+            self._started = True
+            self._closed = False
+            logger.info(f"Driver pool started with {self.size} browsers")
+
+    def __enter__(self):
+        # A lazy pool only starts its browsers the first time one is checked out
+        self._closed = False
+        if not self.lazy:
+            self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @contextmanager
+    def driver(self):
+        """Check out a browser; it is returned (or recycled) when the block exits"""
+        if self._closed:
+            raise RuntimeError("DriverPool is not running")
+        if not self._started:
+            self.start()
+        with self._lock:
+            if not self._page_counts:
+                # Every browser died and none could be replaced; fail instead of waiting forever
+                raise RuntimeError("DriverPool has no browsers left")
+
+        driver = self._idle.get(timeout=DRIVER_CHECKOUT_TIMEOUT)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._checkin(driver, failed)
+
+    def _checkin(self, driver, failed: bool):
+        with self._lock:
+            self._page_counts[id(driver)] = self._page_counts.get(id(driver), 0) + 1
+            worn_out = self._page_counts[id(driver)] >= self.max_pages_per_driver
+
+        if self._closed:
+            self._quit(driver)
+            return
+
+        if failed or worn_out:
+            # Replace the browser so leaked memory or a wedged session does not carry over
+            reason = "an error" if failed else f"{self._page_counts[id(driver)]} pages"
+            logger.info(f"Recycling browser after {reason}")
+            self._quit(driver)
+            try:
+                driver = new_headless_driver()
+            except Exception as e:
+                with self._lock:
+                    remaining = len(self._page_counts)
+                logger.error(f"Failed to start replacement browser, pool is down to "
+                             f"{remaining}/{self.size} browsers: {str(e)}")
+                return
+            with self._lock:
+                self._page_counts[id(driver)] = 0
+        self._idle.put(driver)
+
+    def _quit(self, driver):
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {str(e)}")
+
+    def close(self):
+        """Shut down every idle browser; browsers still checked out are closed on check-in"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+        logger.info("Driver pool shut down")
@@ -0,0 +1,315 @@
+import csv
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from logics.filters import FACET_FIELDS, clean_filters
+from logics.manifest import MANIFEST_PATH, CrawlManifest, company_hash
+from logics.vectorindex import COLLECTION_NAME, active_index_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+COMPANY_DB = './data/companies.sqlite3'
+DIRECTORY_PAGE_SIZE = 10
+MIN_KEEP_RATIO = 0.5     # a sync may not remove more than this share of the stored companies
+TAG_SEPARATOR = '\x1f'      # group_concat separator (char(31)); tags may contain commas
+
+# Scraper fields stored as columns, in extract_company_details order plus the crawl fields
+COMPANY_COLUMNS = ['company_name', 'website_url', 'contact_person', 'contact_number', 'contact_email',
+                   'category', 'subcategory', 'description', 'source_url', 'page_scraped']
+# Scraper fields kept in the vector index metadata, by metadata key (see vectordb.build_company_document)
+INDEX_FIELDS = {'company_name': 'name', 'website_url': 'website', 'contact_person': 'contact',
+                'category': 'category', 'subcategory': 'subcategory', 'source_url': 'source'}
+EXPORT_HEADER = ['Company Name', 'Website', 'Contact Person', 'Contact Number', 'Contact Email',
+                 'Category', 'Subcategory', 'Description', 'Tags', 'Source URL']
+
+
+def company_id(company: Dict) -> str:
+    """Stable company ID, derived from its directory URL (also the vector index document ID)"""
+    key = company.get('source_url') or company.get('company_name') or ''
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _like_pattern(text: str) -> str:
+    """Substring LIKE pattern with the wildcards in `text` escaped"""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _join_chunks(parts: List[str]) -> str:
+    """Undo the text splitter: drop the words each chunk repeats from the end of the one before"""
+    text = parts[0] if parts else ''
+    for part in parts[1:]:
+        overlap = next((k for k in range(min(len(text), len(part)), 0, -1)
+                        if text.endswith(part[:k]) and (k == len(text) or text[-k - 1].isspace())), 0)
+        text += part[overlap:] if overlap else ' ' + part
+    return text
+
+
+def companies_from_index(ids: List[str], metadatas: List[Dict], documents: List[str]) -> List[Dict]:
+    """Scraper records recovered from the vector index chunks, one per company.
+    Empty metadata values come back as None, as the scraper leaves missing fields;
+    the contact number and email are not in the index and stay None."""
+    companies: Dict[str, Dict] = {}
+    descriptions: Dict[str, List[Tuple[int, str]]] = {}
+    for doc_id, metadata, document in zip(ids, metadatas, documents):
+        metadata = metadata or {}
+        cid = metadata.get('company_id')
+        if not cid:
+            continue  # documents from the old full-rebuild layout carry no company fields
+        if cid not in companies:
+            company = {column: None for column in COMPANY_COLUMNS}
+            company.update({column: metadata.get(key) or None for column, key in INDEX_FIELDS.items()})
+            company['page_scraped'] = metadata.get('page') or None
+            company['tags'] = [tag for tag in (metadata.get('tags') or '').split(', ') if tag]
+            companies[cid] = company
+        field = metadata.get('field')
+        if field == 'description':
+            # Chunk IDs end in their position; each chunk repeats the company header
+            position = int(doc_id.rsplit(':', 1)[-1])
+            descriptions.setdefault(cid, []).append((position, document.split('\nDescription: ', 1)[-1]))
+        elif field is None and '\nDescription: ' in (document or ''):
+            # Whole-company document from before field-aware chunking
+            text = document.split('\nDescription: ', 1)[1].rsplit('\nCategory: ', 1)[0]
+            descriptions.setdefault(cid, []).append((0, text))
+    for cid, company in companies.items():
+        company['description'] = _join_chunks([text for _, text in sorted(descriptions.get(cid, []))])
+    return list(companies.values())
+
+
+class CompanyStore:
+    """Canonical copy of the scraped companies in SQLite (WAL mode).
+
+    One typed row per company plus a tag table, written by the scraper on every
+    crawl. The vector index is rebuilt from here; the directory, facets and
+    exports query it directly through its indexes.
+    """
+
+    def __init__(self, path: str = COMPANY_DB, manifest_path: Optional[str] = MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS companies (
+                company_id TEXT PRIMARY KEY,
+                company_name TEXT,
+                website_url TEXT,
+                contact_person TEXT,
+                contact_number TEXT,
+                contact_email TEXT,
+                category TEXT,
+                subcategory TEXT,
+                description TEXT,
+                source_url TEXT,
+                page_scraped INTEGER,
+                content_hash TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS company_tags (
+                company_id TEXT NOT NULL REFERENCES companies (company_id) ON DELETE CASCADE,
+                tag TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (company_id, tag)
+            )
+        """)
+        # The directory lists by name; facets and filters group and match on these columns
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_name ON companies (company_name COLLATE NOCASE)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_category ON companies (category, subcategory)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_subcategory ON companies (subcategory)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_company_tags_tag ON company_tags (tag, company_id)")
+        self._conn.commit()
+        if manifest_path:
+            self._import_manifest(manifest_path)
+
+    def _import_manifest(self, manifest_path: str):
+        """Seed an empty store from the crawl manifest, which holds the last parsed record per company"""
+        if self.count() or not os.path.exists(manifest_path):
+            return
+        manifest = CrawlManifest(manifest_path)
+        companies = [manifest.get(url)['company'] for url in manifest.urls()]
+        if companies:
+            self.sync(companies)
+            logger.info(f"Imported {len(companies)} companies from {manifest_path}")
+
+    def seed_from_index(self, path: Optional[str] = None, collection_name: str = COLLECTION_NAME) -> int:
+        """Seed an empty store from the live vector index, for installs whose index was
+        built before the store existed. Returns the number of companies imported."""
+        path = path or active_index_path()
+        if self.count() or not os.path.isdir(path):
+            return 0
+        from langchain_community.vectorstores import Chroma  # only needed once, after an upgrade
+
+        # Metadata only, so no embedding function is needed
+        collection = Chroma(persist_directory=path, collection_name=collection_name)._collection
+        existing = collection.get(include=["metadatas", "documents"])
+        companies = companies_from_index(existing["ids"], existing["metadatas"], existing["documents"])
+        if companies:
+            self.sync(companies)
+            logger.info(f"Imported {len(companies)} companies from the vector index at {path}")
+        return len(companies)
+
+    def sync(self, companies: List[Dict]) -> Dict[str, int]:
+        """Make the store match `companies` (the full result of a crawl) in one transaction.
+        Only new and changed companies are written; companies not in the list are deleted.
+        Raises ValueError, leaving the store untouched, if that would remove most of them."""
+        now = datetime.now().isoformat()
+        incoming = {company_id(company): company for company in companies}
+        stats = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+        with self._lock, self._conn:
+            existing = dict(self._conn.execute("SELECT company_id, content_hash FROM companies"))
+            kept = sum(1 for cid in existing if cid in incoming)
+            if existing and kept < len(existing) * MIN_KEEP_RATIO:
+                raise ValueError(f"Crawl keeps {kept} of {len(existing)} stored companies, refusing to sync")
+            for cid, company in incoming.items():
+                digest = company_hash(company)
+                previous = existing.get(cid)
+                if previous == digest:
+                    stats['unchanged'] += 1
+                    # The listing page a company sits on moves without its record changing
+                    self._conn.execute("UPDATE companies SET source_url = ?, page_scraped = ? WHERE company_id = ?",
+                                       (company.get('source_url'), company.get('page_scraped'), cid))
+                    continue
+                stats['new' if previous is None else 'changed'] += 1
+                # Values are stored as scraped (None stays None), so all_companies() gives back
+                # the same records and the vector index sees the same document text
+                values = [company.get(column) for column in COMPANY_COLUMNS]
+                self._conn.execute(
+                    "INSERT INTO companies (company_id, " + ", ".join(COMPANY_COLUMNS) + ", content_hash, first_seen, "
+                    "updated_at) VALUES (" + ", ".join("?" * (len(COMPANY_COLUMNS) + 4)) + ") "
+                    "ON CONFLICT (company_id) DO UPDATE SET "
+                    + ", ".join(f"{column} = excluded.{column}" for column in COMPANY_COLUMNS)
+                    + ", content_hash = excluded.content_hash, updated_at = excluded.updated_at",
+                    [cid] + values + [digest, now, now]
+                )
+                self._conn.execute("DELETE FROM company_tags WHERE company_id = ?", (cid,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO company_tags (company_id, tag, position) VALUES (?, ?, ?)",
+                    [(cid, tag, i) for i, tag in enumerate(company.get('tags') or []) if tag]
+                )
+            removed = [(cid,) for cid in existing if cid not in incoming]
+            self._conn.executemany("DELETE FROM companies WHERE company_id = ?", removed)
+            stats['removed'] = len(removed)
+        logger.info(f"Company store synced: {stats}")
+        return stats
+
+    def _where(self, search: Optional[str] = None, filters: Optional[Dict] = None) -> Tuple[str, List]:
+        """WHERE clause on `companies c` for a name search and facet filters"""
+        filters = clean_filters(filters)
+        clauses, params = [], []
+        if search:
+            clauses.append("c.company_name LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(search))
+        for field in ('category', 'subcategory'):
+            if field in filters:
+                clauses.append(f"c.{field} = ?")
+                params.append(filters[field])
+        if filters.get('tags'):
+            # Several tags match companies with any of them, as in filters.build_where
+            clauses.append("c.company_id IN (SELECT company_id FROM company_tags WHERE tag IN ("
+                           + ", ".join("?" * len(filters['tags'])) + "))")
+            params.extend(filters['tags'])
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _query(self, sql: str, params: Iterable) -> List[Dict]:
+        with self._lock:
+            cursor = self._conn.execute(sql, list(params))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _select(self, where: str, params: List, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        sql = ("SELECT c.company_id, " + ", ".join(f"c.{column}" for column in COMPANY_COLUMNS) + ", "
+               "(SELECT group_concat(tag, char(31)) FROM "
+               "(SELECT tag FROM company_tags t WHERE t.company_id = c.company_id ORDER BY position)) AS tags "
+               "FROM companies c" + where + " ORDER BY c.company_name COLLATE NOCASE, c.company_id")
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit, offset]
+        rows = self._query(sql, params)
+        for row in rows:
+            row['tags'] = row['tags'].split(TAG_SEPARATOR) if row['tags'] else []
+        return rows
+
+    def page(self, search: Optional[str] = None, filters: Optional[Dict] = None,
+             limit: int = DIRECTORY_PAGE_SIZE, offset: int = 0) -> List[Dict]:
+        """One page of companies ordered by name"""
+        where, params = self._where(search, filters)
+        return self._select(where, params, limit, offset)
+
+    def count(self, search: Optional[str] = None, filters: Optional[Dict] = None) -> int:
+        where, params = self._where(search, filters)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM companies c" + where, params).fetchone()[0]
+
+    def facet_counts(self, filters: Optional[Dict] = None) -> Dict[str, Dict[str, int]]:
+        """Company counts per category, subcategory and tag, with the same semantics as
+        filters.facet_counts: each field is counted under the other fields' selections."""
+        filters = clean_filters(filters)
+        counts = {}
+        for field in FACET_FIELDS:
+            where, params = self._where(filters={k: v for k, v in filters.items() if k != field})
+            if field == 'tags':
+                sql = ("SELECT t.tag, COUNT(*) FROM company_tags t JOIN companies c USING (company_id)"
+                       + where + " GROUP BY t.tag")
+            else:
+                condition = f"c.{field} IS NOT NULL AND c.{field} != ''"
+                where = f"{where} AND {condition}" if where else f" WHERE {condition}"
+                sql = f"SELECT c.{field}, COUNT(*) FROM companies c{where} GROUP BY c.{field}"
+            with self._lock:
+                counts[field] = dict(self._conn.execute(sql, params).fetchall())
+        return counts
+
+    def all_companies(self) -> List[Dict]:
+        """Every company as the scraper returned it, for rebuilding the vector index"""
+        companies = []
+        for row in self._select("", []):
+            company = {column: row[column] for column in COMPANY_COLUMNS}
+            company['tags'] = row['tags']
+            companies.append(company)
+        return companies
+
+    def export_csv(self, search: Optional[str] = None, filters: Optional[Dict] = None) -> str:
+        """The matching companies as CSV text, ordered by name"""
+        where, params = self._where(search, filters)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_HEADER)
+        for row in self._select(where, params):
+            writer.writerow([
+                row['company_name'], row['website_url'], row['contact_person'], row['contact_number'],
+                row['contact_email'], row['category'], row['subcategory'], row['description'],
+                ', '.join(row['tags']), row['source_url'],
+            ])
+        return buffer.getvalue()
+
+
+_store: Optional[CompanyStore] = None
+_store_lock = threading.Lock()
+
+
+def get_company_store() -> CompanyStore:
+    """Process-wide company store shared by every Streamlit session"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CompanyStore()
+            try:
+                _store.seed_from_index()
+            except Exception as e:
+                logger.warning(f"Could not seed the company store from the vector index: {str(e)}")
+        return _store
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+CRAWL_CONCURRENCY = 8            # max requests in flight across all hosts
+CRAWL_REQUESTS_PER_SECOND = 4.0  # politeness limit per host
+REQUEST_TIMEOUT = 10             # seconds
+USER_AGENT = "Mozilla/5.0 (compatible; JeronAI-Crawler/1.0)"
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host so we never exceed the per-host rate"""
+
+    def __init__(self, requests_per_second: float = CRAWL_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url: str):
+        """Sleep until the host of `url` has a free request slot"""
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class FetchResult:
+    """Outcome of a single HTTP fetch"""
+
+    def __init__(self, url: str, status: int, text: str = "", headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = headers or {}  # lower-cased header names
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class AsyncCrawler:
+    """Shared pooled HTTP session with bounded concurrency and per-host rate limiting.
+
+    Use as an async context manager so the connection pool is closed when the run ends:
+
+        async with AsyncCrawler() as crawler:
+            result = await crawler.fetch(url)
+    """
+
+    def __init__(self, concurrency: int = CRAWL_CONCURRENCY,
+                 requests_per_second: float = CRAWL_REQUESTS_PER_SECOND,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": USER_AGENT}
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET a URL through the shared session. Network errors surface as status 0."""
+        if self._session is None:
+            raise RuntimeError("AsyncCrawler must be used inside 'async with'")
+
+        async with self._semaphore:
+            await self.rate_limiter.wait(url)
+            try:
+                async with self._session.get(url, headers=headers) as response:
+                    text = await response.text() if response.status == 200 else ""
+                    headers = {k.lower(): v for k, v in response.headers.items()}
+                    return FetchResult(url, response.status, text, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"⚠️ Error fetching {url}: {str(e)}")
+                return FetchResult(url, 0)
+
+
+class CrawlReport:
+    """Per-run bookkeeping the scraper fills in for the WebScraping page"""
+
+    COMPANY_STATUSES = ("new", "changed", "unchanged", "removed")
+
+    def __init__(self):
+        self.listing_pages: List[Dict] = []
+        self.listing_errors: List[str] = []
+        self.companies: Dict[str, List[str]] = {status: [] for status in self.COMPANY_STATUSES}
+
+    def record_listing(self, page: int, url: str, method: str, links: int):
+        """Record how a directory page was read: method is 'http' (fast path) or 'browser'"""
+        self.listing_pages.append({"page": page, "url": url, "method": method, "links": links})
+
+    @property
+    def browser_fallbacks(self) -> int:
+        return sum(1 for entry in self.listing_pages if entry["method"] == "browser")
+
+    def record_company(self, url: str, status: str):
+        """Record whether a company was new, changed, unchanged or removed since the last run"""
+        self.companies[status].append(url)
+
+    def summary(self) -> Dict[str, int]:
+        return {status: len(urls) for status, urls in self.companies.items()}
@@ -0,0 +1,101 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from helper_functions.embedcache import EmbeddingCache, get_embedding_cache
+from helper_functions.llm import count_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+EMBED_BATCH_TOKENS = 8000       # token budget per embeddings request (API limit is 8191 per input)
+EMBED_BATCH_MAX_TEXTS = 256     # hard cap on inputs per request
+EMBED_CONCURRENCY = 4           # batches in flight at once
+EMBED_MAX_RETRIES = 5
+EMBED_BACKOFF_SECONDS = 1.0     # doubled on every retry
+
+
+def pack_batches(texts: List[str], max_tokens: int = EMBED_BATCH_TOKENS,
+                 max_texts: int = EMBED_BATCH_MAX_TEXTS) -> List[List[int]]:
+    """Group text indices into request batches that stay under the token budget.
+    A single text larger than the budget gets a batch of its own."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_texts):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _embed_with_retry(embeddings: Embeddings, texts: List[str], batch_no: int) -> List[List[float]]:
+    for attempt in range(EMBED_MAX_RETRIES):
+        try:
+            return embeddings.embed_documents(texts)
+        except Exception as e:
+            if attempt == EMBED_MAX_RETRIES - 1:
+                raise
+            delay = EMBED_BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, EMBED_BACKOFF_SECONDS)
+            logger.warning(f"Embedding batch {batch_no} failed ({str(e)}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _embed_batch(embeddings: Embeddings, cache: EmbeddingCache, model: str, texts: List[str],
+                 batch_no: int) -> List[List[float]]:
+    """Embed one batch and checkpoint it to the cache in the worker, so a batch that
+    finishes is kept even if another batch fails"""
+    vectors = _embed_with_retry(embeddings, texts, batch_no)
+    cache.put_many(model, texts, vectors)
+    return vectors
+
+
+def embed_texts(texts: List[str], embeddings: Embeddings, model: Optional[str] = None,
+                concurrency: int = EMBED_CONCURRENCY, cache: Optional[EmbeddingCache] = None) -> List[List[float]]:
+    """Embed `texts` in token-budgeted batches, several batches at a time.
+
+    Every completed batch is written to the embedding cache by its worker, which acts
+    as the checkpoint: if the run fails partway, the next run finds those vectors in
+    the cache and only embeds the batches that never finished.
+    """
+    cache = cache or get_embedding_cache()
+    model = model or getattr(embeddings, "model", None)
+    if not model:
+        raise ValueError("Embedding model name is required for caching")
+
+    vectors = cache.get_many(model, texts)
+    pending = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if not pending:
+        logger.info(f"All {len(texts)} texts resumed from embedding cache")
+        return vectors
+
+    batches = pack_batches(pending)
+    logger.info(f"Embedding {len(pending)} texts in {len(batches)} batches "
+                f"({len(texts) - len(pending)} already cached)")
+
+    fresh = {}
+    start_time = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(_embed_batch, embeddings, cache, model, [pending[i] for i in batch], batch_no): batch
+            for batch_no, batch in enumerate(batches, start=1)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            batch_texts = [pending[i] for i in futures[future]]
+            batch_vectors = future.result()  # already checkpointed by the worker
+            fresh.update(zip(batch_texts, batch_vectors))
+            logger.info(f"Embedded batch {done}/{len(batches)}")
+
+    logger.info(f"Embedded {len(pending)} texts in {time.monotonic() - start_time:.1f}s")
+    return [v if v is not None else fresh[t] for t, v in zip(texts, vectors)]
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Filters are plain dicts: {'category': str, 'subcategory': str, 'tags': [str, ...]}.
+# Missing or empty keys do not filter. Several tags match companies with any of them.
+FACET_FIELDS = ('category', 'subcategory', 'tags')
+TAG_KEY_PREFIX = "tag:"
+
+
+def tag_key(tag: str) -> str:
+    """Metadata key that flags a tag on a company, e.g. 'tag:machine-learning'.
+    Chroma metadata cannot hold lists, so each tag is its own boolean key."""
+    return TAG_KEY_PREFIX + re.sub(r'[^a-z0-9]+', '-', tag.lower()).strip('-')
+
+
+def metadata_tags(metadata: Dict) -> List[str]:
+    return [t.strip() for t in (metadata.get('tags') or '').split(',') if t.strip()]
+
+
+def clean_filters(filters: Optional[Dict]) -> Dict:
+    """Drop empty values so {} means 'no filter'"""
+    filters = filters or {}
+    cleaned = {}
+    for field in ('category', 'subcategory'):
+        if filters.get(field):
+            cleaned[field] = filters[field]
+    if filters.get('tags'):
+        cleaned['tags'] = sorted(set(filters['tags']))
+    return cleaned
+
+
+def build_where(filters: Optional[Dict]) -> Optional[Dict]:
+    """Chroma `where` clause for the filters, or None when nothing is selected"""
+    filters = clean_filters(filters)
+    clauses = [{field: {"$eq": filters[field]}} for field in ('category', 'subcategory') if field in filters]
+    tag_clauses = [{tag_key(tag): {"$eq": True}} for tag in filters.get('tags', [])]
+    if len(tag_clauses) > 1:
+        clauses.append({"$or": tag_clauses})
+    else:
+        clauses.extend(tag_clauses)
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches(metadata: Dict, filters: Optional[Dict]) -> bool:
+    """Same test as build_where, applied to a metadata dict in Python"""
+    filters = clean_filters(filters)
+    for field in ('category', 'subcategory'):
+        if field in filters and metadata.get(field) != filters[field]:
+            return False
+    if filters.get('tags'):
+        return any(metadata.get(tag_key(tag)) for tag in filters['tags'])
+    return True
+
+
+def filters_key(filters: Optional[Dict]) -> str:
+    """Short stable key for cache namespaces; 'all' when nothing is selected"""
+    filters = clean_filters(filters)
+    if not filters:
+        return "all"
+    return hashlib.sha1(json.dumps(filters, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def facet_counts(metadatas: Iterable[Dict], filters: Optional[Dict] = None) -> Dict[str, Counter]:
+    """Companies per category, subcategory and tag.
+
+    Each field is counted under the other fields' selections, so the counts show
+    what picking a different value would return. Expects one metadata dict per company.
+    """
+    filters = clean_filters(filters)
+    counts = {field: Counter() for field in FACET_FIELDS}
+    for metadata in metadatas:
+        for field in FACET_FIELDS:
+            others = {k: v for k, v in filters.items() if k != field}
+            if not matches(metadata, others):
+                continue
+            if field == 'tags':
+                counts[field].update(metadata_tags(metadata))
+            elif metadata.get(field):
+                counts[field][metadata[field]] += 1
+    return counts
+
+
+def get_facets(vectordb, lexical=None, filters: Optional[Dict] = None) -> Dict[str, Counter]:
+    """Facet counts, from indexed queries on the company store once it holds the
+    scraped companies. Before that, uses the in-memory BM25 documents when
+    available, or else the metadata from Chroma, one entry per company."""
+    from logics.companystore import get_company_store  # imports this module
+
+    store = get_company_store()
+    if store.count():
+        return {field: Counter(counts) for field, counts in store.facet_counts(filters).items()}
+    if lexical is not None and len(lexical):
+        return facet_counts((doc['metadata'] for doc in lexical.documents), filters)
+    existing = vectordb._collection.get(include=["metadatas"])
+    per_company = {}
+    for doc_id, metadata in zip(existing["ids"], existing["metadatas"]):
+        metadata = metadata or {}
+        per_company.setdefault(metadata.get('company_id') or doc_id, metadata)
+    return facet_counts(per_company.values(), filters)
@@ -0,0 +1,118 @@
+import logging
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from logics.filters import build_where, clean_filters, matches
+from logics.lexical import BM25Index, tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+HYBRID_CANDIDATES = 20      # results taken from each retriever before fusion
+RRF_K = 60                  # reciprocal rank fusion constant
+LEXICAL_MAX_TERMS = 3       # short keyword queries up to this many terms skip the vector search
+CHUNKS_PER_COMPANY = 3      # vector hits fetched per wanted company (profile, labels, description)
+FIELD_ORDER = {'profile': 0, 'labels': 1, 'description': 2}
+
+
+def rrf_fuse(rankings: List[List[str]], k: int = RRF_K) -> List[str]:
+    """Reciprocal rank fusion: each list contributes 1 / (k + rank) per ID"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda key: scores[key], reverse=True)
+
+
+def is_lexical_query(query: str, lexical: BM25Index) -> bool:
+    """Quoted queries, and short queries made only of indexed terms (tags, product
+    names, acronyms), are answered by BM25 alone without calling the embeddings API"""
+    stripped = query.strip()
+    if len(stripped) > 2 and stripped[0] == stripped[-1] == '"':
+        return True
+    terms = tokenize(stripped)
+    return 0 < len(terms) <= LEXICAL_MAX_TERMS and all(lexical.knows(t) for t in terms)
+
+
+def _merge_chunks(chunks: List[Document]) -> Document:
+    """One Document per company from its matched chunks, in field order, without
+    repeating the company header line that every chunk starts with"""
+    chunks = sorted(chunks, key=lambda doc: FIELD_ORDER.get(doc.metadata.get('field'), len(FIELD_ORDER)))
+    seen, lines = set(), []
+    for chunk in chunks:
+        for line in chunk.page_content.splitlines():
+            if line not in seen:
+                seen.add(line)
+                lines.append(line)
+    metadata = {k: v for k, v in chunks[0].metadata.items() if k not in ('field', 'field_hash')}
+    metadata['matched_fields'] = ", ".join(doc.metadata.get('field', 'all') for doc in chunks)
+    return Document(page_content="\n".join(lines), metadata=metadata)
+
+
+def lexical_document(entry: Dict, query: str) -> Document:
+    """Document for a BM25 hit made of the field chunks that contain a query term,
+    plus the profile chunk, like the matched chunks of a vector hit"""
+    if 'chunks' not in entry:
+        # Indexes saved before field chunking keep the whole company text
+        return Document(page_content=entry['text'], metadata=entry['metadata'])
+    terms = set(tokenize(query))
+    matched = []
+    for field, texts in entry['chunks'].items():
+        for text in texts:
+            # Every chunk starts with the company header, so only its body decides a match
+            body = text.split("\n", 1)[-1]
+            if field == 'profile' or terms & set(tokenize(body)):
+                matched.append(Document(page_content=text, metadata={**entry['metadata'], 'field': field}))
+    return _merge_chunks(matched)
+
+
+def vector_search(vectordb, query: str, k: int, where: Optional[Dict] = None) -> List[Document]:
+    """Top-k companies by vector similarity. Chunk hits are aggregated per company
+    (each chunk adds 1 / (RRF_K + rank)), so a company matching on several fields
+    ranks above one that matches on a single field. Only matched chunks are kept."""
+    scores: Dict[str, float] = {}
+    chunks: Dict[str, List[Document]] = {}
+    for rank, doc in enumerate(vectordb.similarity_search(query, k=k * CHUNKS_PER_COMPANY, filter=where), start=1):
+        # Legacy documents have no company ID; fall back to the text as the key
+        cid = doc.metadata.get('company_id') or doc.page_content
+        scores[cid] = scores.get(cid, 0.0) + 1.0 / (RRF_K + rank)
+        chunks.setdefault(cid, []).append(doc)
+    ranked = sorted(scores, key=lambda cid: scores[cid], reverse=True)[:k]
+    return [_merge_chunks(chunks[cid]) for cid in ranked]
+
+
+def hybrid_search(vectordb, lexical: Optional[BM25Index], query: str, k: int = 4,
+                  candidates: int = HYBRID_CANDIDATES, filters: Optional[Dict] = None) -> List[Document]:
+    """Top-k companies for `query`, fusing BM25 and vector rankings per company.
+    `filters` (see logics.filters) restrict both retrievers before ranking."""
+    filters = clean_filters(filters)
+    where = build_where(filters)
+    candidates = max(candidates, k)
+    if lexical is None or len(lexical) == 0:
+        return vector_search(vectordb, query, k, where)
+
+    allowed = (lambda metadata: matches(metadata, filters)) if filters else None
+    lexical_hits = lexical.search(query.strip().strip('"'), k=candidates, allowed=allowed)
+    if is_lexical_query(query, lexical) and lexical_hits:
+        logger.info(f"Lexical-only search: {len(lexical_hits)} BM25 hits")
+        return [lexical_document(entry, query) for entry, _ in lexical_hits[:k]]
+
+    by_id: Dict[str, Document] = {}
+    lexical_ranking = []
+    for entry, _ in lexical_hits:
+        by_id[entry['company_id']] = lexical_document(entry, query)
+        lexical_ranking.append(entry['company_id'])
+
+    vector_ranking = []
+    for doc in vector_search(vectordb, query, candidates, where):
+        cid = doc.metadata.get('company_id') or doc.page_content
+        vector_ranking.append(cid)
+        # The vector hit carries the chunks matched by meaning, which may differ from the keyword ones
+        by_id[cid] = doc
+
+    fused = rrf_fuse([lexical_ranking, vector_ranking])
+    logger.info(f"Hybrid search: {len(lexical_ranking)} lexical, {len(vector_ranking)} vector candidates")
+    return [by_id[cid] for cid in fused[:k]]
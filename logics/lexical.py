@@ -0,0 +1,137 @@
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+LEXICAL_INDEX_FILE = "bm25.json"    # stored inside each index version directory
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Field weights: a term in the name or tags counts more than one in the description
+FIELD_WEIGHTS = {
+    'name': 3,
+    'tags': 3,
+    'category': 2,
+    'subcategory': 2,
+    'description': 1,
+}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "that", "the", "to", "we", "with", "want", "need", "looking",
+    "find", "company", "companies", "which", "who", "our", "us", "you", "your",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens; keeps '+' and '#' so C++ and C# survive"""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def company_fields(company: Dict) -> Dict[str, str]:
+    """Searchable text fields of a scraped company"""
+    return {
+        'name': company.get('company_name', '') or '',
+        'tags': ' '.join(company.get('tags', []) or []),
+        'category': company.get('category', '') or '',
+        'subcategory': company.get('subcategory', '') or '',
+        'description': company.get('description', '') or '',
+    }
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring over weighted company fields.
+
+    Each document keeps the field chunks and metadata that went into Chroma, so
+    results can be turned into Documents without touching the vector store.
+    """
+
+    def __init__(self, postings: Dict[str, Dict[int, int]], doc_lengths: List[int],
+                 documents: List[Dict]):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.documents = documents
+        self.avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    def __len__(self):
+        return len(self.documents)
+
+    @classmethod
+    def build(cls, entries: List[Tuple[str, Dict[str, str], Dict[str, List[str]], Dict]]) -> "BM25Index":
+        """Build from (company_id, fields, chunks per field, metadata) tuples"""
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lengths: List[int] = []
+        documents: List[Dict] = []
+        for doc_no, (cid, fields, chunks, metadata) in enumerate(entries):
+            counts: Counter = Counter()
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS.get(field, 1)
+                for term in tokenize(text):
+                    counts[term] += weight
+            for term, tf in counts.items():
+                postings.setdefault(term, {})[doc_no] = tf
+            doc_lengths.append(sum(counts.values()))
+            documents.append({'company_id': cid, 'chunks': chunks, 'metadata': metadata})
+        logger.info(f"Built BM25 index over {len(documents)} companies, {len(postings)} terms")
+        return cls(postings, doc_lengths, documents)
+
+    def knows(self, term: str) -> bool:
+        return term in self.postings
+
+    def search(self, query: str, k: int = 20,
+               allowed: Optional[Callable[[Dict], bool]] = None) -> List[Tuple[Dict, float]]:
+        """Top-k (document, score) pairs; documents with no query term are left out.
+        `allowed` is called with a document's metadata to restrict the candidates."""
+        scores: Dict[int, float] = {}
+        excluded = set()
+        n = len(self.documents)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_no, tf in posting.items():
+                if allowed is not None and doc_no not in scores:
+                    if doc_no in excluded:
+                        continue
+                    if not allowed(self.documents[doc_no]['metadata']):
+                        excluded.add(doc_no)
+                        continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_no] / self.avg_length)
+                scores[doc_no] = scores.get(doc_no, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[doc_no], score) for doc_no, score in ranked]
+
+    def save(self, index_dir: str):
+        path = os.path.join(index_dir, LEXICAL_INDEX_FILE)
+        payload = {
+            'postings': {term: [[d, tf] for d, tf in posting.items()] for term, posting in self.postings.items()},
+            'doc_lengths': self.doc_lengths,
+            'documents': self.documents,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved BM25 index to {path}")
+
+    @classmethod
+    def load(cls, index_dir: str) -> Optional["BM25Index"]:
+        """The index saved with a version, or None if that version has none"""
+        path = os.path.join(index_dir, LEXICAL_INDEX_FILE)
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        postings = {term: {d: tf for d, tf in pairs} for term, pairs in payload['postings'].items()}
+        return cls(postings, payload['doc_lengths'], payload['documents'])
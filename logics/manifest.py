@@ -0,0 +1,92 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+MANIFEST_PATH = "./data/crawl_manifest.json"
+
+# Fields added by the crawler rather than parsed from the page
+_CRAWL_FIELDS = ('source_url', 'page_scraped')
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def company_hash(company: Dict) -> str:
+    """Stable hash of the parsed extract_company_details output"""
+    parsed = {k: v for k, v in company.items() if k not in _CRAWL_FIELDS}
+    return content_hash(json.dumps(parsed, sort_keys=True, ensure_ascii=False))
+
+
+class CrawlManifest:
+    """Persistent per-company crawl state keyed by company URL.
+
+    Each entry keeps the validators needed for conditional GETs (ETag, Last-Modified),
+    hashes of the raw page and of the parsed record, and the parsed record itself so
+    unchanged companies can be returned without downloading or parsing them again.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.entries = json.load(f)
+                logger.info(f"Loaded crawl manifest with {len(self.entries)} companies")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable crawl manifest {path}: {str(e)}")
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.entries.get(url)
+
+    def urls(self) -> List[str]:
+        return list(self.entries)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified"""
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url: str, company: Dict, body_hash: str, etag: Optional[str] = None,
+               last_modified: Optional[str] = None):
+        self.entries[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'content_hash': company_hash(company),
+            'company': company,
+            'checked_at': datetime.now(timezone.utc).isoformat()
+        }
+
+    def touch(self, url: str):
+        """Mark an entry as confirmed unchanged by the server"""
+        if url in self.entries:
+            self.entries[url]['checked_at'] = datetime.now(timezone.utc).isoformat()
+
+    def remove(self, url: str):
+        self.entries.pop(url, None)
+
+    def save(self):
+        """Write atomically so an interrupted run never leaves a truncated manifest"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Crawl manifest saved with {len(self.entries)} companies")
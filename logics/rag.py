@@ -0,0 +1,111 @@
+import logging
+import time
+from typing import Dict, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+RAG_MODEL = "gpt-4o-mini"
+RETRIEVER_K = 4             # companies passed to the LLM
+RETRIEVAL_OVERFETCH = 50    # candidates retrieved for the reranker to choose from
+
+RECOMMENDATION_PROMPT_TEMPLATE = """You are an expert business matchmaker specializing in connecting users with the most suitable companies from the IMDA directory. Follow these guidelines carefully:
+<Context>
+{context}
+</Context>
+
+<User Query>
+{question}
+</User Query>
+
+<Response Requirements>
+1. Always begin with "Based on your needs, here are my recommendations:" 
+2. For each recommended company, provide:
+- Company Name (bold)
+- Match Score (0-100% based on relevance)
+- Key Matching Factors (bullet points)
+- Specializations/Capabilities
+- Contact Method (if available)
+3. Include 3 recommendations maximum, ordered by relevance, minimum 60% match score
+4. If no companies match well, explain why and suggest alternative approaches
+4. If no good matches exist, explain why and suggest alternative approaches
+5. End with: "Would you like me to refine these recommendations or provide more details on any company?"
+6. Never hallucinate details - if info isn't in the context, say so
+</Response Requirements>
+
+<Output Format>
+##### Recommendation Summary
+[Concise 2-3 sentence overview of why these companies were selected]
+
+##### Top Recommendations
+1. **Company Name** (Match Score: XX%)
+- Key Factors: 
+    - Factor 1
+    - Factor 2
+- Specializes in: [capabilities]
+- Website: [URL or Website address if available]
+
+2. **Company Name** (Match Score: XX%)
+...
+
+##### Next Steps
+[Actionable next steps for the user]
+</OutputFormat>
+
+Helpful Recommendation:"""
+
+
+def retrieve(vectordb, query: str, k: int = RETRIEVER_K, filters: Optional[Dict] = None,
+             lexical=None, reranker=None, overfetch: int = RETRIEVAL_OVERFETCH) -> List[Document]:
+    """Companies to ground the recommendation on, limited to the selected category,
+    subcategory and tags. BM25 and vector results are fused, over-fetched and
+    reranked locally, so only the best `k` reach the prompt.
+    `lexical` and `reranker` default to the live BM25 index and the configured reranker."""
+    from logics.hybrid import hybrid_search
+    from logics.rerank import rerank
+
+    if lexical is None:
+        from logics.vectorindex import get_lexical_index
+        lexical = get_lexical_index()
+    candidates = hybrid_search(vectordb, lexical, query, k=overfetch, filters=filters)
+    return [doc for doc, _ in rerank(query, candidates, top_n=k, reranker=reranker)]
+
+
+def build_prompt(query: str, docs: List[Document]) -> str:
+    """Fill the recommendation prompt the same way RetrievalQA's stuff chain did"""
+    context = "\n\n".join(doc.page_content for doc in docs)
+    return RECOMMENDATION_PROMPT_TEMPLATE.format(context=context, question=query)
+
+
+def stream_answer(prompt: str, model: str = RAG_MODEL) -> Iterator[str]:
+    """Yield the recommendation token by token as the LLM produces it"""
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(model=model, streaming=True)
+    for chunk in llm.stream(prompt):
+        if chunk.content:
+            yield chunk.content
+
+
+class TimedStream:
+    """Wraps a token stream and records time-to-first-token and total time.
+    Both are measured from `started_at` (a time.monotonic() value), e.g. when Search was clicked."""
+
+    def __init__(self, tokens: Iterator[str], started_at: Optional[float] = None):
+        self.tokens = tokens
+        self.started_at = started_at if started_at is not None else time.monotonic()
+        self.first_token_seconds: Optional[float] = None
+        self.total_seconds: Optional[float] = None
+
+    def __iter__(self):
+        for token in self.tokens:
+            if self.first_token_seconds is None:
+                self.first_token_seconds = time.monotonic() - self.started_at
+            yield token
+        self.total_seconds = time.monotonic() - self.started_at
+        logger.info(f"Answer streamed: first token {self.first_token_seconds or 0:.2f}s, "
+                    f"total {self.total_seconds:.2f}s")
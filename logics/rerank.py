@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from logics.lexical import tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+RERANKER = os.getenv("RERANKER", "feature")       # feature | cross-encoder | none
+CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# Weights of the feature scorer; each feature is in [0, 1]
+RERANK_WEIGHTS = {
+    'name': 2.0,        # share of query terms found in the company name
+    'labels': 1.5,      # ... in tags, category and subcategory
+    'coverage': 1.0,    # ... anywhere in the document
+    'phrase': 0.5,      # two query terms appear next to each other
+    'prior': 1.0,       # position in the fused retrieval ranking
+}
+
+
+class NoopReranker:
+    """Keeps the retrieval order (baseline for benchmarks)"""
+    name = "none"
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        return [1.0 / (1 + rank) for rank in range(len(docs))]
+
+
+class FeatureReranker:
+    """Cheap CPU scorer: weighted query-term overlap with the name, labels and
+    text of each company, plus a prior for its retrieval rank. No model needed."""
+    name = "feature"
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or RERANK_WEIGHTS
+
+    def features(self, terms: List[str], doc: Document, rank: int) -> Dict[str, float]:
+        metadata = doc.metadata or {}
+        name_terms = set(tokenize(metadata.get('name', '')))
+        label_terms = set(tokenize(" ".join(
+            str(metadata.get(field, '')) for field in ('tags', 'category', 'subcategory')
+        )))
+        content = tokenize(doc.page_content)
+        content_terms = set(content)
+        bigrams = set(zip(content, content[1:]))
+
+        unique = set(terms)
+        share = (lambda found: len(unique & found) / len(unique)) if unique else (lambda found: 0.0)
+        return {
+            'name': share(name_terms),
+            'labels': share(label_terms),
+            'coverage': share(content_terms),
+            'phrase': 1.0 if any(pair in bigrams for pair in zip(terms, terms[1:])) else 0.0,
+            'prior': 1.0 / (1 + rank),
+        }
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        terms = tokenize(query)
+        return [
+            sum(self.weights.get(name, 0.0) * value for name, value in self.features(terms, doc, rank).items())
+            for rank, doc in enumerate(docs)
+        ]
+
+
+class CrossEncoderReranker:
+    """Local cross-encoder (sentence-transformers, optional dependency) that reads
+    query and document together; slower than the feature scorer but more accurate"""
+    name = "cross-encoder"
+
+    def __init__(self, model_name: str = CROSS_ENCODER_MODEL):
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        if not docs:
+            return []
+        return [float(s) for s in self.model.predict([(query, doc.page_content) for doc in docs])]
+
+
+def rerank(query: str, docs: Sequence[Document], top_n: int,
+           reranker=None) -> List[Tuple[Document, float]]:
+    """Best `top_n` (document, score) pairs; ties keep the retrieval order"""
+    reranker = reranker or get_reranker()
+    scores = reranker.score(query, docs)
+    order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)[:top_n]
+    return [(docs[i], scores[i]) for i in order]
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def set_reranker(reranker):
+    """Swap the reranker used by searches (e.g. in benchmarks)"""
+    global _reranker
+    with _reranker_lock:
+        _reranker = reranker
+
+
+def get_reranker():
+    """Process-wide reranker chosen by RERANKER; falls back to the feature scorer
+    if the cross-encoder cannot be loaded"""
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            if RERANKER == "none":
+                _reranker = NoopReranker()
+            elif RERANKER == "cross-encoder":
+                try:
+                    _reranker = CrossEncoderReranker()
+                except Exception as e:
+                    logger.warning(f"Cross-encoder unavailable ({str(e)}), using the feature reranker")
+                    _reranker = FeatureReranker()
+            else:
+                _reranker = FeatureReranker()
+            logger.info(f"Using {_reranker.name} reranker")
+        return _reranker
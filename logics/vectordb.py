@@ -1,114 +1,253 @@
-import requests
-import re
+import hashlib
 import logging
 import os
-import streamlit as st
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from helper_functions.embedcache import CachedEmbeddings
+from logics.companystore import company_id, get_company_store
+from logics.embedpipeline import embed_texts
+from logics.filters import tag_key
+from logics.lexical import BM25Index, company_fields
+from logics.vectorindex import COLLECTION_NAME, check_index, discard_version, prepare_version, publish_version
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Configuration
-VECTORDB_PATH = "./imda_vectordb"
-CHUNK_SIZE = 10000
-CHUNK_OVERLAP = 0
+CHUNK_SIZE = 1000           # description chunks; the name and label blocks are always one chunk each
+CHUNK_OVERLAP = 100
+UPSERT_BATCH_SIZE = 500
+CHUNK_FIELDS = ('profile', 'labels', 'description')
 
-def create_vector_db(companies: List[Dict]) -> Chroma:
-    """Create and persist vector database"""
-    logger.info(f"Entered create_vector_db function with {len(companies)} companies")
-    if not companies:
-        raise ValueError("No companies data provided")
-    
-    # if 'vectordb' in st.session_state:
-    #     st.session_state.vectordb.delete_collection()
-    #     st.session_state.vectordb = None
-    #     logger.info("Existing vector collection deleted")
-    #logger.info(companies)
-    
-     # Check and cleanup existing vector DB
-    logger.info(f"Checking for existing vector DB at {VECTORDB_PATH}")
-    try:
-        if os.path.exists(VECTORDB_PATH):
-            logger.info(f"Found existing vector DB at {VECTORDB_PATH}, cleaning up...")
-            
-            # Initialize connection to existing DB
-            existing_db = Chroma(
-                persist_directory=VECTORDB_PATH,
-                collection_name="imda_accred_companies",
-                embedding_function=OpenAIEmbeddings()
-            )
-            
-            # Delete collection if exists
-            collection_count = existing_db._collection.count()
-            if collection_count > 0:
-                logger.info(f"Deleting existing collection with {collection_count} documents")
-                existing_db.delete_collection()
-            
-            # # Clean up files
-            # for f in os.listdir(VECTORDB_PATH):
-            #     os.remove(os.path.join(VECTORDB_PATH, f))
-            # logger.info("Existing vector DB cleaned up successfully")
-            
-    except Exception as e:
-        logger.warning(f"Error cleaning up existing vector DB: {str(e)}")
-        raise
-                    
-    texts = []
-    metadatas = []
-    
-    for company in companies:
-        # Create document text combining relevant fields
-        doc_text = (
-            f"Company: {company.get('company_name', '')}\n"
-            f"Website: {company.get('website_url', '')}\n"
-            f"Description: {company.get('description', '')}\n"
+
+def build_company_document(company: Dict):
+    """Document text and metadata stored in Chroma for one company"""
+    # Create document text combining relevant fields
+    doc_text = (
+        f"Company: {company.get('company_name', '')}\n"
+        f"Website: {company.get('website_url', '')}\n"
+        f"Description: {company.get('description', '')}\n"
+        f"Category: {company.get('category', '')}\n"
+        f"Subcategory: {company.get('subcategory', '')}\n"
+        f"Tags: {', '.join(company.get('tags', []))}"
+    )
+
+    # Preserve all metadata
+    metadata = {
+        'company_id': company_id(company),
+        'source': company.get('source_url', '') or '',
+        'name': company.get('company_name', '') or '',
+        'category': company.get('category', '') or '',
+        'subcategory': company.get('subcategory', '') or '',
+        'contact': company.get('contact_person', '') or '',
+        'website': company.get('website_url', '') or '',
+        'page': company.get('page_scraped', 0) or '',
+        'tags': ', '.join(company.get('tags', [])) or ''# Convert list to comma-separated string
+    }
+    # One boolean key per tag so searches can filter on tags with a `where` clause
+    for tag in company.get('tags', []):
+        metadata[tag_key(tag)] = True
+    # Hash everything that ends up in the index so unchanged companies can be skipped
+    fingerprint = doc_text + repr(sorted((k, v) for k, v in metadata.items() if k != 'page'))
+    metadata['content_hash'] = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+    return doc_text, metadata
+
+
+def build_company_chunks(company: Dict, text_splitter: RecursiveCharacterTextSplitter) -> Dict[str, List[str]]:
+    """Texts to embed per field: the name/website block, the category/tag block and
+    the description (split if long). Every chunk starts with the company name so it
+    still identifies the company when it reaches the prompt on its own."""
+    header = f"Company: {company.get('company_name', '')}"
+    chunks = {
+        'profile': [f"{header}\nWebsite: {company.get('website_url', '')}"],
+        'labels': [
+            f"{header}\n"
             f"Category: {company.get('category', '')}\n"
             f"Subcategory: {company.get('subcategory', '')}\n"
             f"Tags: {', '.join(company.get('tags', []))}"
-        )
-        
-        # Preserve all metadata
-        metadata = {
-            'source': company.get('source_url', '') or '',
-            'name': company.get('company_name', '') or '',
-            'category': company.get('category', '') or '',
-            'subcategory': company.get('subcategory', '') or '',
-            'contact': company.get('contact_person', '') or '',
-            'website': company.get('website_url', '') or '',
-            'page': company.get('page_scraped', 0) or '',
-            'tags': ', '.join(company.get('tags', [])) or ''# Convert list to comma-separated string
-        }
-        
-        texts.append(doc_text)
-        metadatas.append(metadata)
-        
-    
-    # Split documents
+        ],
+        'description': [],
+    }
+    description = (company.get('description', '') or '').strip()
+    if description:
+        chunks['description'] = [f"{header}\nDescription: {part}" for part in text_splitter.split_text(description)]
+    return chunks
+
+
+def field_hash(texts: List[str]) -> str:
+    return hashlib.sha256("\x00".join(texts).encode('utf-8')).hexdigest()
+
+
+def _existing_index_state(vectordb: Chroma) -> Tuple[Dict[str, str], Dict[str, Dict[str, Tuple[str, List[str]]]], List[str]]:
+    """Read content hashes, and per field the hash and chunk IDs, of every company
+    already in the collection"""
+    existing = vectordb._collection.get(include=["metadatas"])
+    hashes: Dict[str, str] = {}
+    fields: Dict[str, Dict[str, Tuple[str, List[str]]]] = {}
+    legacy_ids: List[str] = []
+    for doc_id, meta in zip(existing["ids"], existing["metadatas"]):
+        cid = (meta or {}).get('company_id')
+        if not cid:
+            # Documents from the old full-rebuild layout have random IDs
+            legacy_ids.append(doc_id)
+            continue
+        hashes[cid] = meta.get('content_hash', '')
+        # Whole-company chunks from before field-aware chunking have no field
+        field = meta.get('field', 'legacy')
+        previous_hash, ids = fields.setdefault(cid, {}).get(field, (meta.get('field_hash', ''), []))
+        fields[cid][field] = (previous_hash, ids + [doc_id])
+    return hashes, fields, legacy_ids
+
+
+def sync_collection(vectordb: Chroma, companies: List[Dict], embed: Callable[[List[str]], List[List[float]]],
+                    chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> Tuple[Dict, BM25Index]:
+    """Apply `companies` to an open collection and build the matching BM25 index.
+
+    Each company is stored as separate profile, labels and description chunks that
+    share its company_id. Only fields whose text changed are re-embedded; if just
+    the metadata changed, the existing chunks are updated in place. Companies no
+    longer present are deleted. Returns counts for logging and the index checks,
+    plus the BM25 index (not yet saved).
+    """
+    existing_hashes, existing_fields, legacy_ids = _existing_index_state(vectordb)
+    logger.info(f"Existing collection has {len(existing_hashes)} companies "
+                f"and {len(legacy_ids)} legacy documents")
+
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=10000,
-        chunk_overlap=0,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
         length_function=len
     )
-    
-    splitted_documents = text_splitter.create_documents(texts, metadatas=metadatas)
-    logger.info(splitted_documents)
-    # Create vector store
+
+    texts, ids, metadatas = [], [], []
+    update_ids, update_metadatas = [], []
+    stale_ids = list(legacy_ids)
+    current_ids = set()
+    lexical_entries = []
+    unchanged = 0
+    for company in companies:
+        _, metadata = build_company_document(company)
+        cid = metadata['company_id']
+        if cid in current_ids:
+            continue  # same company listed twice
+        current_ids.add(cid)
+        chunks = build_company_chunks(company, text_splitter)
+        lexical_entries.append((cid, company_fields(company), chunks, metadata))
+
+        old_fields = existing_fields.get(cid, {})
+        # Skip only companies already stored as field chunks; the old whole-company
+        # layout is migrated even when the content is unchanged
+        chunked = set(old_fields) == {field for field, chunk_texts in chunks.items() if chunk_texts}
+        if existing_hashes.get(cid) == metadata['content_hash'] and chunked:
+            unchanged += 1
+            continue
+
+        for field, old in old_fields.items():
+            if field not in CHUNK_FIELDS:
+                stale_ids.extend(old[1])
+        for field, chunk_texts in chunks.items():
+            new_hash = field_hash(chunk_texts)
+            old_hash, old_ids = old_fields.get(field, ('', []))
+            chunk_metadata = {**metadata, 'field': field, 'field_hash': new_hash}
+            if old_ids and old_hash == new_hash:
+                # Same text, so the vectors are still valid; rewrite the metadata only
+                update_ids.extend(old_ids)
+                update_metadatas.extend(chunk_metadata for _ in old_ids)
+                continue
+            # Drop the old chunks first in case the new text splits into fewer pieces
+            stale_ids.extend(old_ids)
+            for i, text in enumerate(chunk_texts):
+                texts.append(text)
+                ids.append(f"{cid}:{field}:{i}")
+                metadatas.append(chunk_metadata)
+
+    removed = [cid for cid in existing_hashes if cid not in current_ids]
+    for cid in removed:
+        for _, old_ids in existing_fields[cid].values():
+            stale_ids.extend(old_ids)
+
+    if stale_ids:
+        vectordb.delete(ids=stale_ids)
+    for i in range(0, len(update_ids), UPSERT_BATCH_SIZE):
+        batch_ids = update_ids[i:i + UPSERT_BATCH_SIZE]
+        # Chroma merges metadata on update, so a removed tag's `tag:` key would survive.
+        # Re-add the chunks with their stored vectors and text and the full new metadata.
+        stored = vectordb._collection.get(ids=batch_ids, include=["embeddings", "documents"])
+        by_id = {doc_id: (vector, document) for doc_id, vector, document
+                 in zip(stored["ids"], stored["embeddings"], stored["documents"])}
+        vectordb.delete(ids=batch_ids)
+        vectordb._collection.add(
+            ids=batch_ids,
+            embeddings=[by_id[doc_id][0] for doc_id in batch_ids],
+            documents=[by_id[doc_id][1] for doc_id in batch_ids],
+            metadatas=update_metadatas[i:i + UPSERT_BATCH_SIZE]
+        )
+    if texts:
+        vectors = embed(texts)
+        for i in range(0, len(ids), UPSERT_BATCH_SIZE):
+            vectordb._collection.upsert(
+                ids=ids[i:i + UPSERT_BATCH_SIZE],
+                embeddings=vectors[i:i + UPSERT_BATCH_SIZE],
+                documents=texts[i:i + UPSERT_BATCH_SIZE],
+                metadatas=metadatas[i:i + UPSERT_BATCH_SIZE]
+            )
+
+    logger.info(f"VectorDB refreshed: {len(texts)} chunks embedded, {len(update_ids)} chunks re-tagged, "
+                f"{unchanged} companies unchanged, {len(removed)} companies removed")
+    stats = {
+        'companies': len(current_ids),
+        'previous_companies': len(existing_hashes),
+        'embedded_documents': len(texts),
+        'updated_documents': len(update_ids),
+        'unchanged': unchanged,
+        'removed': len(removed),
+    }
+    # The BM25 index is cheap to build, so it is rebuilt in full next to the collection
+    return stats, BM25Index.build(lexical_entries)
+
+
+def create_vector_db(companies: List[Dict]) -> Chroma:
+    """Bring the persisted vector database in line with `companies`.
+
+    The update is applied to a copy of the live index in a new version directory,
+    which only becomes live after it passes a document-count check, so readers
+    always see a complete index.
+    """
+    logger.info(f"Entered create_vector_db function with {len(companies)} companies")
+    if not companies:
+        raise ValueError("No companies data provided")
+
+    version, version_path = prepare_version()
     try:
-        embedding_model = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
-        vectordb = Chroma.from_documents(
-            collection_name="imda_accred_companies",  # Specify a collection name here if needed
-            documents=splitted_documents,
-            embedding=embedding_model,
-            persist_directory=VECTORDB_PATH
+        openai_embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
+        vectordb = Chroma(
+            persist_directory=version_path,
+            collection_name=COLLECTION_NAME,
+            embedding_function=CachedEmbeddings(openai_embeddings)
         )
+        # Batched, concurrent embedding with retry; resumes from the cache after a failure
+        stats, lexical = sync_collection(vectordb, companies, lambda texts: embed_texts(texts, openai_embeddings))
         vectordb.persist()
-        logger.info(f"VectorDB created with {len(splitted_documents)} documents")
+        lexical.save(version_path)
         logger.info(f"Total vectordb collection count: {vectordb._collection.count()}")
+
+        new_hashes, _, new_legacy_ids = _existing_index_state(vectordb)
+        check_index(len(new_hashes) + len(new_legacy_ids), stats['companies'], stats['previous_companies'])
+        publish_version(version)
         return vectordb
     except Exception as e:
-        logger.error(f"Error creating vector DB: {str(e)}")
-        raise
\ No newline at end of file
+        logger.error(f"Error updating vector DB: {str(e)}")
+        discard_version(version)
+        raise
+
+
+def rebuild_vector_db() -> Chroma:
+    """Derive the vector index from the canonical company store"""
+    companies = get_company_store().all_companies()
+    if not companies:
+        # An empty store would wipe the index; it is filled by a crawl or seeded from the index
+        raise ValueError("Company store is empty, refusing to rebuild the vector index from it")
+    return create_vector_db(companies)
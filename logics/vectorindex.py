@@ -0,0 +1,169 @@
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+VECTORDB_ROOT = "./imda_vectordb"
+COLLECTION_NAME = "imda_accred_companies"
+VERSIONS_DIR = os.path.join(VECTORDB_ROOT, "versions")
+CURRENT_POINTER = os.path.join(VECTORDB_ROOT, "CURRENT")
+KEEP_VERSIONS = 3        # published versions kept on disk for rollback
+MIN_KEEP_RATIO = 0.5     # a rebuild may not shrink the index below this share of the live one
+
+# Layout:
+#   imda_vectordb/CURRENT            -> name of the live version
+#   imda_vectordb/versions/<version> -> one complete Chroma directory per rebuild
+# Before the first versioned rebuild the Chroma files live directly in imda_vectordb/.
+
+
+def _version_path(version: str) -> str:
+    return os.path.join(VERSIONS_DIR, version)
+
+
+def active_version() -> Optional[str]:
+    """Name of the live index version, or None for the legacy unversioned layout"""
+    try:
+        with open(CURRENT_POINTER, encoding='utf-8') as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    if version and os.path.isdir(_version_path(version)):
+        return version
+    logger.warning(f"Index pointer names missing version '{version}', using legacy layout")
+    return None
+
+
+def active_index_path() -> str:
+    """Directory readers should open; always a complete, published index"""
+    version = active_version()
+    return _version_path(version) if version else VECTORDB_ROOT
+
+
+def list_versions() -> List[str]:
+    """Published and in-progress versions, oldest first"""
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    return sorted(os.listdir(VERSIONS_DIR))
+
+
+def prepare_version() -> Tuple[str, str]:
+    """Create a new version directory seeded with a copy of the live index.
+    Rebuilds write here so readers never see a half-updated collection."""
+    version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = _version_path(version)
+    source = active_index_path()
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    if os.path.exists(os.path.join(source, "chroma.sqlite3")):
+        shutil.copytree(source, path, ignore=shutil.ignore_patterns("versions", "CURRENT", "CURRENT.tmp"))
+        logger.info(f"Seeded index version {version} from {source}")
+    else:
+        os.makedirs(path)
+        logger.info(f"Created empty index version {version}")
+    return version, path
+
+
+def discard_version(version: str):
+    """Remove a version that failed to build; the live index is never touched"""
+    if version == active_version():
+        raise ValueError("Refusing to delete the live index version")
+    shutil.rmtree(_version_path(version), ignore_errors=True)
+    logger.info(f"Discarded index version {version}")
+
+
+def _write_pointer(version: str):
+    # os.replace is atomic, so readers see either the old or the new version name
+    tmp_path = f"{CURRENT_POINTER}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, CURRENT_POINTER)
+
+
+def check_index(new_count: int, expected_count: int, previous_count: int):
+    """Sanity check a rebuilt index before it goes live"""
+    if new_count != expected_count:
+        raise ValueError(f"Index holds {new_count} companies, expected {expected_count}")
+    if previous_count and new_count < previous_count * MIN_KEEP_RATIO:
+        raise ValueError(f"Index shrank from {previous_count} to {new_count} companies, refusing to publish")
+
+
+def publish_version(version: str):
+    """Atomically point readers at `version` and prune old versions"""
+    _write_pointer(version)
+    logger.info(f"Published index version {version}")
+
+    published = [v for v in list_versions() if v <= version]
+    for old in published[:-KEEP_VERSIONS]:
+        shutil.rmtree(_version_path(old), ignore_errors=True)
+        logger.info(f"Pruned index version {old}")
+
+
+def rollback_index() -> str:
+    """Point readers back at the version published before the live one"""
+    current = active_version()
+    older = [v for v in list_versions() if current is None or v < current]
+    if not older:
+        raise ValueError("No previous index version to roll back to")
+    previous = older[-1]
+    _write_pointer(previous)
+    logger.info(f"Rolled index back from {current} to {previous}")
+    return previous
+
+
+# --- Shared reader handle ---
+# One Chroma client and one embedding client per process, reused by every Streamlit
+# session and page. The handle is rebuilt when a new index version is published.
+_store = None
+_store_path = None
+_embeddings = None
+_lexical = None
+_lexical_path = None
+_store_lock = threading.Lock()
+
+
+def get_embeddings():
+    """Process-wide OpenAI embeddings client behind the shared embedding cache"""
+    global _embeddings
+    with _store_lock:
+        if _embeddings is None:
+            from helper_functions.embedcache import cached_openai_embeddings
+            _embeddings = cached_openai_embeddings()
+        return _embeddings
+
+
+def get_vectordb():
+    """Process-wide Chroma handle on the live index version"""
+    global _store, _store_path
+    embeddings = get_embeddings()
+    path = active_index_path()
+    with _store_lock:
+        if _store is None or _store_path != path:
+            from langchain_community.vectorstores import Chroma
+            _store = Chroma(
+                persist_directory=path,
+                collection_name=COLLECTION_NAME,
+                embedding_function=embeddings
+            )
+            _store_path = path
+            logger.info(f"Opened vector index at {path} with {_store._collection.count()} documents")
+        return _store
+
+
+def get_lexical_index():
+    """Process-wide BM25 index of the live version, or None if the version has none"""
+    global _lexical, _lexical_path
+    path = active_index_path()
+    with _store_lock:
+        if _lexical_path != path:
+            from logics.lexical import BM25Index
+            _lexical = BM25Index.load(path)
+            _lexical_path = path
+            if _lexical is None:
+                logger.info(f"No lexical index at {path}, search is vector-only")
+        return _lexical
@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+WEB_RESEARCH_CONCURRENCY = 4        # company searches in flight at once
+SEARCH_CACHE_TTL = 6 * 60 * 60      # seconds a search result stays fresh
+SEARCH_CACHE_SIZE = 1024            # distinct queries kept in memory
+SNIPPET_CHARS = 400                 # per result, when formatting findings for the LLM
+
+
+def normalize_query(query: str) -> str:
+    """Cache key: case and whitespace differences do not count as new queries"""
+    return " ".join(query.lower().split())
+
+
+def company_query(company_name: str) -> str:
+    return f"{company_name} Singapore company products news"
+
+
+class TavilyBackend:
+    """Tavily search with one client shared by every research job"""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._client = None
+        self._lock = threading.Lock()
+
+    def search(self, query: str) -> List[Dict]:
+        with self._lock:
+            if self._client is None:
+                from tavily import TavilyClient
+                self._client = TavilyClient(api_key=self.api_key or os.getenv("TAVILY_API_KEY"))
+        return self._client.search(query=query, search_depth="basic")["results"]
+
+
+class StubSearchBackend:
+    """Offline backend for tests and local runs: canned results, no network.
+    Every query it receives is recorded in `queries`."""
+
+    def __init__(self, results: Optional[Dict[str, List[Dict]]] = None):
+        self.results = {normalize_query(q): r for q, r in (results or {}).items()}
+        self.queries: List[str] = []
+
+    def search(self, query: str) -> List[Dict]:
+        self.queries.append(query)
+        return self.results.get(normalize_query(query), [
+            {"title": f"Stub result for {query}", "url": "https://example.com", "content": ""}
+        ])
+
+
+class CachedSearch:
+    """TTL cache of search results keyed by normalized query, in front of any backend"""
+
+    def __init__(self, backend, ttl: int = SEARCH_CACHE_TTL, maxsize: int = SEARCH_CACHE_SIZE):
+        self.backend = backend
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, query: str) -> List[Dict]:
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        results = self.backend.search(query)
+        with self._lock:
+            self._cache[key] = results
+        return results
+
+
+_search: Optional[CachedSearch] = None
+_search_lock = threading.Lock()
+
+
+def set_search_backend(backend):
+    """Swap the backend used by research jobs (e.g. StubSearchBackend in tests)"""
+    global _search
+    with _search_lock:
+        _search = CachedSearch(backend)
+
+
+def get_search() -> CachedSearch:
+    """Process-wide cached search. SEARCH_BACKEND=stub selects the offline backend."""
+    global _search
+    with _search_lock:
+        if _search is None:
+            backend = StubSearchBackend() if os.getenv("SEARCH_BACKEND") == "stub" else TavilyBackend()
+            _search = CachedSearch(backend)
+        return _search
+
+
+def research_companies(company_names: List[str],
+                       max_workers: int = WEB_RESEARCH_CONCURRENCY) -> Dict[str, List[Dict]]:
+    """Search the web for each company in parallel; a failed search yields no results"""
+    search = get_search()
+
+    def research(name: str) -> List[Dict]:
+        try:
+            return search.search(company_query(name))
+        except Exception as e:
+            logger.error(f"⚠️ Web research failed for {name}: {str(e)}")
+            return []
+
+    names = list(dict.fromkeys(company_names))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names) or 1))) as executor:
+        findings = dict(zip(names, executor.map(research, names)))
+    logger.info(f"Researched {len(names)} companies (cache hits {search.hits}, misses {search.misses})")
+    return findings
+
+
+def format_findings(findings: Dict[str, List[Dict]]) -> str:
+    """Compact text of the findings for the consultant prompt"""
+    sections = []
+    for name, results in findings.items():
+        lines = [f"### {name}"]
+        if not results:
+            lines.append("- No recent information found")
+        for result in results:
+            content = (result.get("content") or "")[:SNIPPET_CHARS]
+            lines.append(f"- {result.get('title', '')} ({result.get('url', '')}): {content}")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
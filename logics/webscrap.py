@@ -1,8 +1,8 @@
 import streamlit as st
 
 from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
+from logics.browserpool import get_driver_path
 import time
 from bs4 import BeautifulSoup
 
@@ -18,7 +18,7 @@ def get_website_content(url):
         options.add_argument('--headless')
         options.add_argument('--disable-gpu')
         options.add_argument('--window-size=1920,1200')
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()),
+        driver = webdriver.Chrome(service=Service(get_driver_path()),
                                   options=options)
         st.write(f"DEBUG:DRIVER:{driver}")
         driver.get(url)
@@ -1,25 +1,19 @@
-import requests
+import asyncio
+import json
 import re
 import logging
 import os
 import time
 from bs4 import BeautifulSoup
-from typing import Dict, List
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+from logics.crawler import AsyncCrawler, CrawlReport
+from logics.companystore import get_company_store
+from logics.manifest import CrawlManifest, company_hash, content_hash
 
 # For website scrapping
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.core.os_manager import ChromeType
+from logics.browserpool import DriverPool, DRIVER_POOL_SIZE, new_headless_driver
 
 # for streamlit cloud compatibility
 # from selenium import webdriver
@@ -43,26 +37,95 @@ load_dotenv()
 
 # Configuration
 #BASE_URL = "https://www.imda.gov.sg/resources/innovative-tech-companies-directory"
+MIN_KEEP_RATIO = 0.5     # a crawl that sees fewer of the known companies removes none of them
+
+# --- Browser-free fast path: read listings straight from the served HTML ---
+def parse_page_range(html_content: str) -> Optional[Dict[str, int]]:
+    """Read pagination from static HTML. Returns None when the pager is rendered client-side."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    numbers = []
+    for link in soup.select('.pagination__list li a[data-page]'):
+        try:
+            numbers.append(int(link['data-page']))
+        except ValueError:
+            continue
+    if not numbers:
+        return None
+
+    # Same rule as the Selenium script: the last pager item is the "next" arrow
+    return {
+        "first_page": numbers[0],
+        "last_page": numbers[-2] if len(numbers) >= 2 else 1
+    }
+
+
+def _iter_json_strings(data):
+    """Yield every string value in a decoded JSON document"""
+    if isinstance(data, dict):
+        for value in data.values():
+            yield from _iter_json_strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _iter_json_strings(value)
+    elif isinstance(data, str):
+        yield data
+
+
+def _links_from_embedded_json(soup: BeautifulSoup, page_url: str) -> List[str]:
+    """Find company detail URLs in JSON payloads embedded in the page (listing state shipped for the XHR-driven cards)"""
+    listing_path = urlparse(page_url).path.rstrip('/') + '/'
+    urls = []
+    for script in soup.find_all('script', type=re.compile('json')):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        for value in _iter_json_strings(data):
+            if '/' not in value or ' ' in value:
+                continue
+            url = urljoin(page_url, value)
+            path = urlparse(url).path
+            if path.startswith(listing_path) and len(path) > len(listing_path):
+                urls.append(url)
+    return urls
+
+
+def parse_listing_links(html_content: str, page_url: str) -> List[str]:
+    """Pull company detail links out of a directory page without a browser"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    urls = [urljoin(page_url, a['href']) for a in soup.select('a.teaser-card__link[href]')]
+    if not urls:
+        urls = _links_from_embedded_json(soup, page_url)
+    # Drop duplicates but keep listing order
+    return list(dict.fromkeys(urls))
+
+
+async def get_page_range(crawler: AsyncCrawler, url: str, pool: DriverPool) -> Dict[str, int]:
+    """Read pagination through the crawler session, falling back to Selenium when the pager is not in the HTML"""
+    response = await crawler.fetch(url)
+    if response.ok:
+        page_info = parse_page_range(response.text)
+        if page_info:
+            logger.info("Pagination read from static HTML")
+            return page_info
+    else:
+        logger.warning(f"Static pagination lookup failed for {url}: status {response.status}")
+
+    logger.info("Pagination not found in static HTML, falling back to Selenium")
+    return await asyncio.to_thread(_get_page_range_pooled, pool, url)
+
 
 # Function to get number of pages in the website
-def get_page_range_selenium(url: str) -> Dict[str, int]:
-    """Extract pagination info using Selenium (for JavaScript-rendered pages)"""
-    
-    #Set up Chrome options
-    options = Options()
-    options.add_argument("--disable-gpu")
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()),
-                                  options=options)
-    logger.info(f"DEBUG:DRIVER:{driver}")
-    # chrome_options = Options()
-    # chrome_options.add_argument("--headless")
-    # chrome_options.add_argument("--disable-gpu")
-    
-    # # Initialize browser with Service
-    # service = Service(ChromeDriverManager().install())
-    # driver = webdriver.Chrome(service=service, options=chrome_options)
-    #driver = get_driver()
+def get_page_range_selenium(url: str, driver=None) -> Dict[str, int]:
+    """Extract pagination info using Selenium (for JavaScript-rendered pages).
+    Pass a pooled `driver` to reuse a running browser; otherwise one is started and closed here."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    own_driver = driver is None
+    if own_driver:
+        driver = new_headless_driver()
     try:
         driver.get(url)
         
@@ -92,20 +155,24 @@ def get_page_range_selenium(url: str) -> Dict[str, int]:
         
     except Exception as e:
         logger.error(f"Selenium pagination error: {str(e)}")
-        return {"first_page": 1, "last_page": 1}
+        # Guessing a single page would make every company on the other pages look removed
+        raise RuntimeError(f"Could not read the directory page count from {url}") from e
     finally:
-        driver.quit()
+        if own_driver:
+            driver.quit()
 
 # Function to extract company URLs from the page
-def extract_company_urls(target_url: str) -> list:
-    # Set up Chrome options
-    options = Options()
-    options.add_argument("--headless")  # Run in background
-    options.add_argument("--disable-gpu")
-    
-    # Initialize browser
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+def extract_company_urls(target_url: str, driver=None) -> list:
+    """Read company detail links from a rendered directory page.
+    Pass a pooled `driver` to reuse a running browser; otherwise one is started and closed here."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support import expected_conditions as EC
+
+    own_driver = driver is None
+    if own_driver:
+        driver = new_headless_driver()
     
     try:
         # Load the page
@@ -124,12 +191,36 @@ def extract_company_urls(target_url: str) -> list:
         logger.info(f"Extracted {len(urls)} company URLs")
         return urls
     
+    except TimeoutException:
+        # The page loaded but showed no company cards; the browser itself is fine
+        logger.error(f"No company links rendered on {target_url}")
+        return []
     except Exception as e:
         logger.error(f"Error extracting URLs from {target_url}: {str(e)}")
+        if not own_driver:
+            raise  # let the pool replace a browser that may have crashed
         return []
     finally:
-        driver.quit()
-        logger.info("Browser session ended")
+        if own_driver:
+            driver.quit()
+            logger.info("Browser session ended")
+
+
+def _get_page_range_pooled(pool: DriverPool, url: str) -> Dict[str, int]:
+    """Worker-thread helper: borrow a browser from the pool to read the pager"""
+    with pool.driver() as driver:
+        return get_page_range_selenium(url, driver)
+
+
+def _extract_company_urls_pooled(pool: DriverPool, target_url: str) -> list:
+    """Worker-thread helper: borrow a browser from the pool for one listing page"""
+    try:
+        with pool.driver() as driver:
+            return extract_company_urls(target_url, driver)
+    except Exception as e:
+        # The pool has already recycled the browser; the page counts as having no links
+        logger.warning(f"Browser failed on {target_url}: {str(e)}")
+        return []
         
     
 # Function to extract company data from HTML
@@ -222,58 +313,159 @@ def extract_company_details(html_content):
         'tags': tags
     }
 
-def process_all_pages(base_url: str) -> List[Dict]:
-    """Process all pages of company directory with URL logging"""
+async def _crawl_listing_page(crawler: AsyncCrawler, pool: DriverPool, listing_semaphore: asyncio.Semaphore,
+                              manifest: CrawlManifest, report: CrawlReport,
+                              base_url: str, page: int, last_page: int) -> List[Dict]:
+    """Collect company URLs from one directory page, then fetch every company page concurrently"""
+    url = f"{base_url}?page={page}"
+    logger.info(f"🔄 Processing page URL: {url}")  # Added URL logging
+
     try:
-        # Get # of pages using Selenium
-        page_info = get_page_range_selenium(base_url)
-        logger.info(f"Found pages: {page_info['first_page']} to {page_info['last_page']}")
-        
-        all_companies = []
-     
-        # Get all company URLs from each page                         
-        for page in range(page_info["first_page"], page_info["last_page"] + 1):
-            url = f"{base_url}?page={page}"
-            logger.info(f"🔄 Processing page URL: {url}")  # Added URL logging
-            
-            try:
-                # Get company URLs from this page
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                companies_urls = extract_company_urls(url)
-                #all_companies.extend(companies_urls)
-                logger.info(f"✅ Processed page {page}/{page_info['last_page']} - {len(companies_urls)} companies")
-                
-                for companies_url in companies_urls:
-                    try:
-                        # Extract detailed company info
-                        #company_html = driver.page_source
-                        logger.info(f"[Process_all_pages] Passing company URL: {companies_url}")
-                        response = requests.get(companies_url, timeout=10)
-                        if response.status_code == 200:
-                            company_data = extract_company_details(response.text)
-                            logger.info(f"[Process_all_pages] Extracting data: {company_data}")
-                            all_companies.append(company_data)
-                            #print(company_data)
-                        else:
-                            print(f"Failed to fetch page. Status code: {response.status_code}")
-                        
-                    except Exception as e:
-                        logger.error(f"⚠️ Error processing company page {companies_url}: {str(e)}")
-                        continue
-                    
-            except Exception as e:
-                logger.error(f"⚠️ Error processing {url}: {str(e)}")
-                continue
-        
-        # Final log before returning
-        logger.info(f"Total companies collected: {len(all_companies)}")
-        #logger.debug(f"Sample company data: {all_companies[0] if all_companies else 'No data'}")
-        
-        #logger.info(all_companies)    
+        response = await crawler.fetch(url)
+        if not response.ok:
+            raise RuntimeError(f"Status code: {response.status}")
+
+        # Fast path: links straight from the HTML we already downloaded
+        companies_urls = parse_listing_links(response.text, url)
+        method = "http"
+        if not companies_urls:
+            # Selenium is blocking, so run it in a worker thread with a pooled browser
+            logger.info(f"No links in static HTML for page {page}, falling back to browser")
+            async with listing_semaphore:
+                companies_urls = await asyncio.to_thread(_extract_company_urls_pooled, pool, url)
+            method = "browser"
+        if not companies_urls:
+            # A directory page is never empty; count it as failed so its companies are kept
+            raise RuntimeError("No company links found over HTTP or in the browser")
+        report.record_listing(page, url, method, len(companies_urls))
+        logger.info(f"✅ Processed page {page}/{last_page} via {method} - {len(companies_urls)} companies")
+    except Exception as e:
+        logger.error(f"⚠️ Error processing {url}: {str(e)}")
+        report.listing_errors.append(url)
+        return []
+
+    async def crawl_company(companies_url: str):
+        try:
+            logger.info(f"[Process_all_pages] Passing company URL: {companies_url}")
+            previous = manifest.get(companies_url)
+            response = await crawler.fetch(companies_url, headers=manifest.conditional_headers(companies_url))
+
+            if response.not_modified and previous:
+                manifest.touch(companies_url)
+                report.record_company(companies_url, "unchanged")
+                return dict(previous['company'], page_scraped=page)
+
+            if not response.ok:
+                logger.warning(f"Failed to fetch {companies_url}. Status code: {response.status}")
+                if previous:
+                    # Keep the last known record rather than dropping the company
+                    report.record_company(companies_url, "unchanged")
+                    return dict(previous['company'], page_scraped=page)
+                return None
+
+            body_hash = content_hash(response.text)
+            if previous and previous.get('body_hash') == body_hash:
+                # Same bytes as last run, no need to parse again
+                company_data = dict(previous['company'], page_scraped=page)
+            else:
+                company_data = extract_company_details(response.text)
+                company_data['source_url'] = companies_url
+                company_data['page_scraped'] = page
+                logger.info(f"[Process_all_pages] Extracting data: {company_data}")
+
+            if previous is None:
+                status = "new"
+            elif previous.get('content_hash') != company_hash(company_data):
+                status = "changed"
+            else:
+                status = "unchanged"
+            report.record_company(companies_url, status)
+
+            manifest.update(companies_url, company_data, body_hash,
+                            etag=response.headers.get('etag'),
+                            last_modified=response.headers.get('last-modified'))
+            return company_data
+        except Exception as e:
+            logger.error(f"⚠️ Error processing company page {companies_url}: {str(e)}")
+            return None
+
+    results = await asyncio.gather(*(crawl_company(u) for u in companies_urls))
+    return [company for company in results if company]
+
+
+async def crawl_directory(base_url: str, pool: DriverPool, manifest: CrawlManifest,
+                          report: CrawlReport) -> List[Dict]:
+    """Crawl all directory pages and their company pages with one shared HTTP session"""
+    # One listing worker per pooled browser
+    listing_semaphore = asyncio.Semaphore(pool.size)
+    async with AsyncCrawler() as crawler:
+        # The pager is read through the same session, so it shares the rate limit and User-Agent
+        page_info = await get_page_range(crawler, base_url, pool)
+        first_page, last_page = page_info["first_page"], page_info["last_page"]
+        logger.info(f"Found pages: {first_page} to {last_page}")
+        pages = await asyncio.gather(*(
+            _crawl_listing_page(crawler, pool, listing_semaphore, manifest, report, base_url, page, last_page)
+            for page in range(first_page, last_page + 1)
+        ))
+    # Flatten while keeping page order
+    return [company for page_companies in pages for company in page_companies]
+
+
+def _reconcile_removed(all_companies: List[Dict], manifest: CrawlManifest, report: CrawlReport) -> List[Dict]:
+    """Handle manifest entries that were not seen in this run"""
+    seen = {company.get('source_url') for company in all_companies}
+    unseen = [url for url in manifest.urls() if url not in seen]
+    known = len(manifest.urls())
+    # Like the index shrink guard: a crawl that loses most known companies is not trusted
+    shrunk = known > 0 and known - len(unseen) < known * MIN_KEEP_RATIO
+    if report.listing_errors or not all_companies or shrunk:
+        # Some listing pages failed (or the directory shrank implausibly), so an unseen company
+        # may simply be on a page we did not read. Carry the last known record forward
+        # instead of treating it as removed.
+        logger.warning(f"{len(report.listing_errors)} listing pages failed, {known - len(unseen)} of {known} "
+                       f"known companies seen; keeping {len(unseen)} unseen companies")
+        for url in unseen:
+            report.record_company(url, "unchanged")
+            all_companies.append(manifest.get(url)['company'])
         return all_companies
 
-        # Process each page and extract company data
+    for url in unseen:
+        report.record_company(url, "removed")
+        manifest.remove(url)
+    return all_companies
+
+
+def process_all_pages(base_url: str, pool_size: int = DRIVER_POOL_SIZE,
+                      report: Optional[CrawlReport] = None,
+                      manifest: Optional[CrawlManifest] = None) -> List[Dict]:
+    """Process all pages of company directory with URL logging.
+    Pages unchanged since the last run (per the crawl manifest) are not re-parsed.
+    Pass a CrawlReport to see how listings were read and which companies changed.
+    Raises ValueError if the company store refuses the result; the manifest is then left as it was."""
+    if report is None:
+        report = CrawlReport()
+    if manifest is None:
+        manifest = CrawlManifest()
+    try:
+        # Browsers are only started if some page needs the Selenium fallback,
+        # and are closed when the run ends
+        with DriverPool(size=pool_size, lazy=True) as pool:
+            start_time = time.monotonic()
+            all_companies = asyncio.run(crawl_directory(base_url, pool, manifest, report))
+
+        all_companies = _reconcile_removed(all_companies, manifest, report)
+
     except Exception as e:
         logger.error(f"❌ Fatal error in processing: {str(e)}")
         return []
+
+    # The company store is the canonical copy; the vector index is rebuilt from it.
+    # It is synced first so a refused sync does not leave the manifest ahead of it.
+    get_company_store().sync(all_companies)
+    manifest.save()
+
+    # Final log before returning
+    logger.info(f"Total companies collected: {len(all_companies)} in {time.monotonic() - start_time:.1f}s")
+    logger.info(f"Listing pages needing browser fallback: {report.browser_fallbacks}/{len(report.listing_pages)}")
+    logger.info(f"Company changes since last run: {report.summary()}")
+    return all_companies
@@ -1,21 +1,15 @@
 import logging
 import os
+import time
 import streamlit as st
 #from logics.agents import setup_agents
 from datetime import datetime
-# Create the RAG pipeline
-from langchain.chains import RetrievalQA
-# from crewai import Agent, Task, Crew
-from logics import agents
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.prompts import PromptTemplate
-import pandas as pd
-# Add this to your existing imports
-from langchain_openai import ChatOpenAI
+# crewai (logics.agents) and the langchain chain/LLM modules are imported on first use below,
+# so opening the page does not pay for them
+from logics.vectorindex import active_version, get_lexical_index, get_vectordb
+from logics.filters import filters_key, get_facets
+from helper_functions.cache import get_response_cache
 from streamlit import logout
-from helper_functions import llm
 from helper_functions.query import log_query
 
 
@@ -31,19 +25,51 @@ logger = logging.getLogger(__name__)
 def initialize_vectordb():
     """Initialize and return the Chroma vector database"""
     try:
-        vectordb = Chroma(
-            persist_directory="./imda_vectordb",
-            collection_name="imda_accred_companies",
-            embedding_function=OpenAIEmbeddings()
-        )
-        logger.info(f"VectorDB loaded with {vectordb._collection.count()} documents")
-        return vectordb
+        # Shared across sessions and reruns; reopened only when a new index version goes live
+        return get_vectordb()
     except Exception as e:
         logger.error(f"Error loading VectorDB: {str(e)}")
         st.error("Failed to load company database. Please check the logs.")
         raise
 
 
+def render_filters(vectordb):
+    """Sidebar facets (category, subcategory, tags) with company counts"""
+    st.sidebar.markdown("**Filter Companies**")
+    filters = {
+        'category': st.session_state.get('filter_category'),
+        'subcategory': st.session_state.get('filter_subcategory'),
+        'tags': st.session_state.get('filter_tags', []),
+    }
+    try:
+        facets = get_facets(vectordb, get_lexical_index(), filters)
+    except Exception as e:
+        logger.error(f"Error loading facets: {str(e)}")
+        return {}
+
+    def options(field):
+        counts = facets[field]
+        selected = filters[field] if field == 'tags' else [filters[field]] if filters[field] else []
+        # Keep the current selection visible even if its count dropped to zero
+        return sorted(set(counts) | set(selected)), counts
+
+    categories, category_counts = options('category')
+    st.sidebar.selectbox("Category", [None] + categories, key='filter_category',
+                         format_func=lambda c: "All categories" if c is None else f"{c} ({category_counts[c]})")
+    subcategories, subcategory_counts = options('subcategory')
+    st.sidebar.selectbox("Subcategory", [None] + subcategories, key='filter_subcategory',
+                         format_func=lambda c: "All subcategories" if c is None else f"{c} ({subcategory_counts[c]})")
+    tags, tag_counts = options('tags')
+    st.sidebar.multiselect("Tags", tags, key='filter_tags',
+                           format_func=lambda t: f"{t} ({tag_counts[t]})")
+    st.sidebar.divider()
+    return {
+        'category': st.session_state.filter_category,
+        'subcategory': st.session_state.filter_subcategory,
+        'tags': st.session_state.filter_tags,
+    }
+
+
 def display_results():
     st.set_page_config(page_title="Companies Recommendation | Jeron.AI", layout="centered")
     st.title("🔍 Companies Recommendation")
@@ -60,6 +86,7 @@ def display_results():
     if 'deep_search' not in st.session_state:
         st.session_state.deep_search = False
     # st.text(f"Loaded with {vectordb._collection.count()} companies")
+    filters = render_filters(vectordb)
     # Search input with validation
     query = st.text_area("Enter your query/use case:", 
                         placeholder="e.g. I want to find a product that specializing in talent recruitment.")
@@ -75,94 +102,74 @@ def display_results():
     # Search button
     if st.button("Search", type="primary"):
         start_time = datetime.now()
+        started_at = time.monotonic()
+        status_slot = st.empty()  # filled in once the answer is complete
+        first_token_time = None
+        stage_timings = None
+        mode = "deep" if st.session_state.deep_search else "rag"
+        index_version = active_version() or "legacy"
+        # Answers depend on the selected filters, so cache entries are scoped to the filter set
+        cache_scope = filters_key(filters)
         
         try:
-            if st.session_state.deep_search:
+            # Keyword queries are answered by BM25 alone, so the semantic tier must not embed them either
+            from logics.hybrid import is_lexical_query
+            lexical = get_lexical_index()
+            semantic = lexical is None or not is_lexical_query(query, lexical)
+
+            # Exact-match LRU first, then the semantic cache
+            response_cache = get_response_cache()
+            result, cache_tier = response_cache.get(query, mode, index_version, semantic=semantic,
+                                                      scope=cache_scope)
+            if cache_tier is None and mode == "deep":
                 with st.spinner("🧠 Performing deep analysis using multi-agent..."):
-                    result = agents.analyze_use_case(query)
+                    from logics import agents
+                    result, stage_timings = agents.run_deep_search(query, filters=filters)
                     
                     #result = "none"
-            else:
+            elif cache_tier is None:
+                from logics import rag
                 with st.spinner("🔍 Searching with LangChain..."):
-                    # RAG pipeline
-                    RECOMMENDATION_PROMPT_TEMPLATE = """You are an expert business matchmaker specializing in connecting users with the most suitable companies from the IMDA directory. Follow these guidelines carefully:
-                    <Context>
-                    {context}
-                    </Context>
-
-                    <User Query>
-                    {question}
-                    </User Query>
-
-                    <Response Requirements>
-                    1. Always begin with "Based on your needs, here are my recommendations:" 
-                    2. For each recommended company, provide:
-                    - Company Name (bold)
-                    - Match Score (0-100% based on relevance)
-                    - Key Matching Factors (bullet points)
-                    - Specializations/Capabilities
-                    - Contact Method (if available)
-                    3. Include 3 recommendations maximum, ordered by relevance, minimum 60% match score
-                    4. If no companies match well, explain why and suggest alternative approaches
-                    4. If no good matches exist, explain why and suggest alternative approaches
-                    5. End with: "Would you like me to refine these recommendations or provide more details on any company?"
-                    6. Never hallucinate details - if info isn't in the context, say so
-                    </Response Requirements>
-
-                    <Output Format>
-                    ##### Recommendation Summary
-                    [Concise 2-3 sentence overview of why these companies were selected]
-
-                    ##### Top Recommendations
-                    1. **Company Name** (Match Score: XX%)
-                    - Key Factors: 
-                        - Factor 1
-                        - Factor 2
-                    - Specializes in: [capabilities]
-                    - Website: [URL or Website address if available]
-
-                    2. **Company Name** (Match Score: XX%)
-                    ...
-
-                    ##### Next Steps
-                    [Actionable next steps for the user]
-                    </OutputFormat>
-
-                    Helpful Recommendation:"""
+                    docs = rag.retrieve(vectordb, query, filters=filters)
+                result = None
+            
+            with st.expander("📄 View Results", expanded=True):
+                st.markdown("#### <u>Query:</u>", unsafe_allow_html=True)
+                st.markdown(query)
+                st.markdown("#### <u>Results:</u>", unsafe_allow_html=True)
+                if result is None:
+                    # Stream the RAG answer token by token
+                    stream = rag.TimedStream(rag.stream_answer(rag.build_prompt(query, docs)), started_at)
+                    result = st.write_stream(stream)
+                    first_token_time = stream.first_token_seconds
+                else:
+                    st.markdown(result)
+                if stage_timings:
+                    st.caption(" · ".join(f"{stage.replace('_', ' ')}: {seconds:.1f}s"
+                                          for stage, seconds in stage_timings.items()))
 
-                    QA_CHAIN_PROMPT = PromptTemplate.from_template(RECOMMENDATION_PROMPT_TEMPLATE)
-                    
-                    rag_chain = RetrievalQA.from_chain_type(
-                        llm=ChatOpenAI(model='gpt-4o-mini'),
-                        retriever=vectordb.as_retriever(k=4),
-                        chain_type_kwargs={"prompt": QA_CHAIN_PROMPT}
-                    )
-                    response = rag_chain.invoke(query)
-                    #response = llm.get_completion_by_messages(query)
-                    result = response['result']
+            if cache_tier is None:
+                response_cache.put(query, mode, index_version, str(result), semantic=semantic,
+                                   scope=cache_scope)
                     
             # Calculate duration
             duration = datetime.now() - start_time
             st.session_state.last_query_time = f"{duration.total_seconds():.2f} seconds"
             
-            # st.session_state.query_history = pd.concat([
-            #     st.session_state.query_history,
-            #     pd.DataFrame([], columns=['timestamp', 'user_email', 'query', 'response', 'response_time'])
-            # ], ignore_index=True)
             # logger.info(f"Deep search result: {result}")
             # logger.info(f"Query: {query}")
             # logger.info(f"Duration: {duration}")
-            log_query(query, result, duration)
+            log_query(query, result, duration, first_token_time=first_token_time, mode=mode, cache_hit=cache_tier)
             
             # Display results
-            st.success(f"Query completed in {st.session_state.last_query_time}")
+            if cache_tier:
+                status_slot.success(f"⚡ Served from cache ({cache_tier} match) in {st.session_state.last_query_time}")
+            elif first_token_time is not None:
+                status_slot.success(f"Query completed in {st.session_state.last_query_time} "
+                                    f"(first token after {first_token_time:.2f} seconds)")
+            else:
+                status_slot.success(f"Query completed in {st.session_state.last_query_time}")
             
-            with st.expander("📄 View Results", expanded=True):
-                st.markdown("#### <u>Query:</u>", unsafe_allow_html=True)
-                st.markdown(query)
-                st.markdown("#### <u>Results:</u>", unsafe_allow_html=True)
-                st.markdown(result)
-                
                 # Query rating system
                 # st.markdown("---")
                 # col1, col2, col3 = st.columns(3)
@@ -268,7 +275,9 @@ def display_results():
     
     # Show database stats
     st.sidebar.markdown(f"**Database Stats**")
-    st.sidebar.markdown(f"Total Companies: {vectordb._collection.count()}")
+    lexical = get_lexical_index()
+    # The collection holds several chunks per company, so count companies from the BM25 index
+    st.sidebar.markdown(f"Total Companies: {len(lexical) if lexical is not None else vectordb._collection.count()}")
     st.sidebar.divider()
 
 # Example usage in your main app
@@ -3,7 +3,8 @@ import time
 import logging
 from datetime import datetime
 from logics.websitescrapping import process_all_pages
-from logics.vectordb import create_vector_db
+from logics.crawler import CrawlReport
+from logics.vectorindex import active_version, list_versions, rollback_index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,8 +22,9 @@ st.set_page_config(
 def scrape_companies(BASE_URL):
     """Simulate scraping process - replace with your actual scraping function"""
     # Replace this with your actual scraping code from process_all_pages()
-    scraped_companies = process_all_pages(BASE_URL)
-    time.sleep(3)  # Simulate scraping delay
+    report = CrawlReport()
+    scraped_companies = process_all_pages(BASE_URL, report=report)
+    st.session_state.crawl_report = report
     #scraped_companies = 125  # Replace with len(companies) from your scraping
     return scraped_companies
 
@@ -69,14 +71,22 @@ def main():
                 # Run the actual scraping
                 try:
                     st.write("Extracting company data...")
-                    st.session_state.companies_scraped = scrape_companies(BASE_URL)
+                    try:
+                        st.session_state.companies_scraped = scrape_companies(BASE_URL)
+                    except ValueError as e:
+                        # The company store refuses a crawl that would remove most of its companies
+                        raise RuntimeError(f"the company store refused the crawl result: {str(e)}") from e
                     st.session_state.companies_scraped_count = len(st.session_state.companies_scraped)  
+                    if not st.session_state.companies_scraped:
+                        # process_all_pages returns nothing after a fatal error; keep the current index
+                        raise RuntimeError("the crawl returned no companies, see the logs")
                     st.session_state.scraping_status = "completed"
                     
-                    # Update VectorDB
+                    # Update VectorDB (langchain/embedding stack is only loaded when a scrape runs)
+                    from logics.vectordb import rebuild_vector_db
                     st.write("🛠️ Updating Vector Database...")
-                    logger.info(f"Creating vector DB with {st.session_state.companies_scraped_count} companies")
-                    st.session_state.vectordb = create_vector_db(st.session_state.companies_scraped)
+                    logger.info(f"Rebuilding vector DB from the company store ({st.session_state.companies_scraped_count} companies)")
+                    st.session_state.vectordb = rebuild_vector_db()
                     st.session_state.vectordb_status = "updated"
                     
                     # Calculate duration
@@ -100,10 +110,35 @@ def main():
         🕒 Last Run: {st.session_state.last_scrape_time.strftime('%Y-%m-%d %H:%M:%S')}  
         """)
         #🕒 Duration Taken: {duration.total_seconds():.1f seconds}  
+        report = st.session_state.get('crawl_report')
+        if report:
+            changes = report.summary()
+            st.info(
+                f"🆕 New: {changes['new']} · ✏️ Changed: {changes['changed']} · "
+                f"✔️ Unchanged: {changes['unchanged']} · 🗑️ Removed: {changes['removed']}"
+            )
+            with st.expander("Company changes since last run"):
+                for status in ("new", "changed", "removed"):
+                    if report.companies[status]:
+                        st.markdown(f"**{status.capitalize()}**")
+                        st.write(report.companies[status])
+        if report and report.listing_pages:
+            with st.expander(f"Listing pages: {report.browser_fallbacks}/{len(report.listing_pages)} needed the browser fallback"):
+                st.dataframe(report.listing_pages, use_container_width=True, hide_index=True)
     elif st.session_state.scraping_status == "in_progress":
         st.warning("Scraping in progress... Please wait")
     elif st.session_state.scraping_status == "error":
         st.error("An error occurred during scraping")
+
+    # Index versions: every rebuild is published as a new version, older ones are kept for rollback
+    st.divider()
+    st.caption(f"Live index version: {active_version() or 'legacy (unversioned)'} · "
+               f"{len(list_versions())} version(s) on disk")
+    if st.button("Roll back to previous index", disabled=st.session_state.scraping_status == "in_progress"):
+        try:
+            st.success(f"Rolled back to index version {rollback_index()}")
+        except ValueError as e:
+            st.warning(str(e))
 ###############################
 
     
@@ -2,47 +2,87 @@ import streamlit as st
 import pandas as pd
 import pkg_resources
 import subprocess
+from helper_functions.embedcache import get_embedding_cache
+from helper_functions import importtiming
+from helper_functions.logauth import get_auth_log
+from helper_functions.logwriter import segment_label
 
 st.set_page_config(layout="centered", page_title="Troubelshooting | Jeron.AI")
 
+AUTH_LOG_PAGE_SIZE = 100
+
+
 def view_auth_logs():
-    """Display authentication logs from CSV file with proper error handling"""
+    """Display authentication logs page by page, newest first.
+    Rows are streamed from the rotated log segments, so history is never loaded all at once."""
     try:
-        # Try to read the log file
-        logs_df = pd.read_csv('logs/auth_logs.csv')
-        
-        # Check if dataframe is empty
-        if logs_df.empty:
-            st.info("No authentication logs available")
+        auth_log = get_auth_log()
+        segments = auth_log.segments()
+        if not segments:
+            st.info("No authentication logs available - log file not found")
+            return
+
+        st.subheader("Authentication Logs for All Users")
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="auth_log_page") - 1
+        rows = auth_log.read_page(page, AUTH_LOG_PAGE_SIZE)
+        if not rows:
+            st.info("No authentication logs available" if page == 0 else "No more entries")
         else:
-            st.subheader("Authentication Logs for All Users")
-            st.dataframe(
-                logs_df.sort_values('timestamp', ascending=False),
-                use_container_width=True
-            )
-            
-            # Add download button
-            csv = logs_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "Download Full Logs",
-                data=csv,
-                file_name='auth_logs_export.csv',
-                mime='text/csv'
-            )
-            
-    except FileNotFoundError:
-        st.info("No authentication logs available - log file not found")
-    except pd.errors.EmptyDataError:
-        st.info("No authentication logs available - file is empty")
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            st.caption(f"Entries {page * AUTH_LOG_PAGE_SIZE + 1}-{page * AUTH_LOG_PAGE_SIZE + len(rows)}, "
+                       f"newest first, across {len(segments)} log file(s)")
+
+        # Each segment is bounded in size; only the one asked for is read into memory
+        with st.expander("Download log files"):
+            segment = st.selectbox("Log file", segments, format_func=lambda s: segment_label(s) or "current",
+                                   key="auth_log_segment")
+            label = segment_label(segment) or "current"
+            if st.button("Prepare download", key="auth_log_prepare"):
+                with open(segment, 'rb') as f:
+                    st.session_state.auth_log_download = (segment, f.read())
+            prepared = st.session_state.get('auth_log_download')
+            if prepared and prepared[0] == segment:
+                st.download_button(
+                    f"Download {label}",
+                    data=prepared[1],
+                    file_name=f"auth_logs_{label}.csv",
+                    mime='text/csv',
+                    key="auth_log_download_button"
+                )
+
     except Exception as e:
         st.error(f"Error loading logs: {str(e)}")
-      
+
 st.subheader("User login profile") 
 st.json(st.user)
 
 st.divider()
 view_auth_logs()
 
+st.divider()
+st.subheader("Embedding Cache")
+try:
+    stats = get_embedding_cache().stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Hit rate", f"{stats['hit_rate']:.0%}", help=f"{stats['hits']} hits / {stats['misses']} misses")
+    col2.metric("Cached vectors", stats['entries'])
+    col3.metric("Size", f"{stats['bytes'] / (1024 * 1024):.1f} MB")
+except Exception as e:
+    st.error(f"Error reading embedding cache: {e}")
+
+st.divider()
+st.subheader("Startup Import Cost")
+startup = importtiming.startup_seconds()
+if startup is not None:
+    st.caption(f"Cold start for this container (process start to app ready): {startup:.2f} seconds")
+packages_cost = importtiming.package_report()
+if packages_cost:
+    st.dataframe(pd.DataFrame(packages_cost).head(25), use_container_width=True, hide_index=True)
+    with st.expander("Slowest modules"):
+        st.dataframe(pd.DataFrame(importtiming.module_report()), use_container_width=True, hide_index=True)
+else:
+    st.info("Import timing is disabled (IMPORT_TIMING=0)")
+
 st.divider()
 # Get pip freeze output
 try:
@@ -4,35 +4,21 @@ from datetime import datetime
 import os
 import logging
 #import helper_functions as query
+from helper_functions.historystore import HISTORY_PAGE_SIZE, get_history_store
+from helper_functions.query import get_history_writer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize or load history from file
-if 'query_history' not in st.session_state:
-    try:
-        st.session_state.query_history = pd.read_csv('logs/query_history.csv', 
-                                                   parse_dates=['timestamp'])
-    except:
-        st.session_state.query_history = pd.DataFrame(columns=[
-            'timestamp', 'query', 'response', 'rating', 'response_time'
-        ])
-
-def delete_query(timestamp, user_email):
+def delete_query(entry_id, user_email):
     """Delete query from history"""
     try:
-        # Ensure timestamp is in datetime format
-        if not isinstance(timestamp, pd.Timestamp):
-            timestamp = pd.to_datetime(timestamp)
-            
-        # Create mask to KEEP all records EXCEPT the matching timestamp AND email
-        mask = ~((st.session_state.query_history['timestamp'] == timestamp) & 
-                (st.session_state.query_history['user_email'] == user_email))
-        
-        st.session_state.query_history = st.session_state.query_history[mask]
-        st.session_state.query_history.to_csv('query_history.csv', index=False)
+        if not get_history_store().delete(entry_id, user_email):
+            st.warning("Query not found")
+            return False
         st.toast("Query deleted successfully")
+        st.session_state.history_unflushed = True
         return True
     except Exception as e:
         logger.error(f"Error deleting query: {str(e)}")
@@ -43,17 +29,12 @@ def display_results():
     """Display query history"""
     st.set_page_config(page_title="Search History | Jeron.AI", layout="centered")
     st.title("📋 Your Query History")
-    st.session_state.query_history = pd.read_csv('logs/query_history.csv')
     # Filter queries for current user
     # user_queries = st.session_state.query_history[
     #     st.session_state.query_history['user_email'] == st.user.email
     # ].copy()
     # logger.info(f"Displaying {len(user_queries)} queries for user {st.user.email}")
     
-    if 'query_history' not in st.session_state:
-        st.warning("No search history available")
-        return
-    
     # Get current user email from either Google auth or session state
     user_email = None
     if hasattr(st, 'user') and st.user.is_logged_in:
@@ -65,39 +46,62 @@ def display_results():
         st.warning("Please login to view your search history")
         return
     
-    # Filter history for current user
-    user_queries = st.session_state.query_history[
-        st.session_state.query_history['user_email'] == user_email
-    ]
-    
-    if user_queries.empty:
+    # Wait for the writer only on the first load, after a delete, or when this session
+    # searched since the last flush, not on every rerun
+    first_load = st.session_state.get('history_user') != user_email
+    if first_load or st.session_state.pop('history_unflushed', False):
+        get_history_writer().flush()
+    store = get_history_store()
+
+    # Keyset cursors of the pages visited so far; page N starts after cursors[N]
+    if first_load:
+        st.session_state.history_user = user_email
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+    page_no = len(cursors) - 1
+
+    rows, next_cursor = store.user_page(user_email, HISTORY_PAGE_SIZE, after=cursors[-1])
+    if not rows and page_no > 0:
+        # The last entries of this page were deleted; step back
+        cursors.pop()
+        st.rerun()
+
+    if not rows:
         st.info("You haven't made any searches yet")
         return
-    
-    if not user_queries.empty:
-        # Ensure proper datetime format
-        user_queries.loc[:, 'timestamp'] = pd.to_datetime(user_queries['timestamp'])
-        
-        for _, row in user_queries.sort_values('timestamp', ascending=False).iterrows():
-            # Safely format the timestamp
-            try:
-                time_str = row['timestamp'].strftime('%m/%d %H:%M')
-            except:
-                time_str = "Unknown time"
-                
-            with st.expander(f"🗓️ {time_str}: {str(row['query'])[:50]}..."):
-                #st.caption(f"⏱️ {row['response_time']}s")
-                st.markdown(f"**Query:** {row['query']}")
-                #st.markdown("---")
-                st.markdown(f"**Ans:**")
-                st.markdown(f"{str(row['response'])}")
-                
-                # Delete button (only shows for user's own queries)
-                if st.button("Delete", key=f"del_{row['timestamp']}"):
-                    if delete_query(row['timestamp'], st.user.email):
-                        st.rerun()
-    else:
-        st.info("No queries yet")
+
+    total = store.user_count(user_email)
+    first = page_no * HISTORY_PAGE_SIZE + 1
+    st.caption(f"Showing {first}-{first + len(rows) - 1} of {total} searches")
+
+    for row in rows:
+        # Safely format the timestamp
+        try:
+            time_str = pd.to_datetime(row['timestamp']).strftime('%m/%d %H:%M')
+        except Exception:
+            time_str = "Unknown time"
+
+        with st.expander(f"🗓️ {time_str}: {str(row['query'])[:50]}..."):
+            #st.caption(f"⏱️ {row['response_time']}s")
+            st.markdown(f"**Query:** {row['query']}")
+            #st.markdown("---")
+            st.markdown(f"**Ans:**")
+            st.markdown(f"{str(row['response'])}")
+
+            # Delete button (only shows for user's own queries)
+            if st.button("Delete", key=f"del_{row['id']}"):
+                if delete_query(row['id'], user_email):
+                    st.rerun()
+
+    col1, _, col3 = st.columns([1, 2, 1])
+    with col1:
+        if page_no > 0 and st.button("← Newer", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col3:
+        if next_cursor is not None and st.button("Older →", use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
 
 if __name__ == "__main__":
     display_results()
@@ -1,6 +1,5 @@
 import streamlit as st
-from langchain.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
+from logics.companystore import DIRECTORY_PAGE_SIZE, get_company_store
 import logging
 import pandas as pd
 
@@ -8,145 +7,148 @@ import pandas as pd
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def initialize_vectordb():
-    """Initialize and return the Chroma vector database"""
+def initialize_store():
+    """Return the company store the scraper writes to"""
     try:
-        vectordb = Chroma(
-            persist_directory="./imda_vectordb",
-            collection_name="imda_accred_companies",
-            embedding_function=OpenAIEmbeddings()
-        )
-        logger.info(f"VectorDB loaded with {vectordb._collection.count()} documents")
-        return vectordb
+        # Shared across sessions and reruns
+        return get_company_store()
     except Exception as e:
-        logger.error(f"Error loading VectorDB: {str(e)}")
+        logger.error(f"Error opening company store: {str(e)}")
         st.error("Failed to load company database. Please check the logs.")
         raise
 
-def get_company_data(vectordb):
-    """Retrieve all company data from ChromaDB"""
-    try:
-        # Get all documents with metadata
-        results = vectordb._collection.get(
-            include=["metadatas", "documents"]
-        )
-        
-        # Build DataFrame
-        companies = []
-        for idx, meta in enumerate(results["metadatas"]):
-            # Safely extract metadata with fallbacks
-            companies.append({
-                "Company Name": meta.get("name", "N/A"),
-                "Website": meta.get("website", "N/A"),
-                "Tags": meta.get("tags", "N/A"),
-            })
-        
-        return pd.DataFrame(companies)
-    
-    except Exception as e:
-        logger.error(f"Error retrieving company data: {str(e)}")
-        return pd.DataFrame()
+def to_frame(rows):
+    """Directory table for one page of company rows"""
+    return pd.DataFrame([{
+        "Company Name": row["company_name"] or "N/A",
+        "Website": row["website_url"] or "N/A",
+        "Category": row["category"] or "N/A",
+        "Contact Person": row["contact_person"] or "N/A",
+        "Contact Number": row["contact_number"] or "N/A",
+        "Contact Email": row["contact_email"] or "N/A",
+        "Tags": ", ".join(row["tags"]) or "N/A",
+    } for row in rows])
 
 def main():
     st.set_page_config(page_title="Company Directory | Jeron.AI", layout="centered")
     st.title("📂 Accredited Companies Directory")
-    
-    # Initialize vector DB
+
+    # Open the company store
     try:
-        vectordb = initialize_vectordb()
-        company_df = get_company_data(vectordb)
-        
-        if company_df.empty:
+        store = initialize_store()
+        total_companies = store.count()
+
+        if not total_companies:
             st.warning("No company data found in the database")
             return
     except:
         return
-    
+
     # Initialize session state for pagination
     if 'page' not in st.session_state:
         st.session_state.page = 1
-        
+
     # Search and filter section
     st.sidebar.header("Search & Filter")
-    
+
     # Text search
     search_term = st.sidebar.text_input("Search companies")
     st.sidebar.divider()
     # Category filter
-    # all_categories = ["All"] + sorted(company_df["Main Category"].unique().tolist())
-    # selected_category = st.sidebar.selectbox("Filter by category", all_categories)
-    
+    filters = {'category': st.session_state.get('directory_category')}
+    try:
+        category_counts = store.facet_counts(filters)['category']
+    except Exception as e:
+        logger.error(f"Error loading categories: {str(e)}")
+        category_counts = {}
+    st.sidebar.selectbox("Filter by category", [None] + sorted(category_counts), key='directory_category',
+                         format_func=lambda c: "All" if c is None else f"{c} ({category_counts[c]})")
+    filters = {'category': st.session_state.directory_category}
+
+    # Back to the first page whenever the search or filter changes
+    selection = (search_term, filters['category'])
+    if st.session_state.get('directory_selection') != selection:
+        st.session_state.directory_selection = selection
+        st.session_state.page = 1
+
     # Apply filters
-    filtered_df = company_df.copy()
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df["Company Name"].str.contains(search_term, case=False)
-        ]
+    filtered_count = store.count(search_term, filters)
+    if not filtered_count:
         # Handle empty search results
-        if filtered_df.empty:
-            st.info(f"No companies found matching '{search_term}'")
-            st.markdown("""
-            <div style="margin-top: 1rem; padding: 1rem; background: #f8f9fa; border-radius: 0.5rem;">
-                <p>Try these suggestions:</p>
-                <ul>
-                    <li>Check your spelling</li>
-                    <li>Use fewer keywords</li>
-                    <li>Browse all companies instead</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
-            return
-    
-    # if selected_category != "All":
-    #     filtered_df = filtered_df[filtered_df["Main Category"] == selected_category]
-    
+        st.info(f"No companies found matching '{search_term}'" if search_term else "No companies in this category")
+        st.markdown("""
+        <div style="margin-top: 1rem; padding: 1rem; background: #f8f9fa; border-radius: 0.5rem;">
+            <p>Try these suggestions:</p>
+            <ul>
+                <li>Check your spelling</li>
+                <li>Use fewer keywords</li>
+                <li>Browse all companies instead</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+
     # Display results
-    st.subheader(f"Showing {len(filtered_df)} companies")
-    
+    st.subheader(f"Showing {filtered_count} companies")
+
     # Pagination settings
-    items_per_page = 10
-    total_pages = max(1, (len(filtered_df) // items_per_page) + 
-                     (1 if len(filtered_df) % items_per_page else 0))
-    
+    items_per_page = DIRECTORY_PAGE_SIZE
+    total_pages = max(1, (filtered_count // items_per_page) +
+                     (1 if filtered_count % items_per_page else 0))
+    st.session_state.page = min(st.session_state.page, total_pages)
+
     # Calculate display range
     start_idx = (st.session_state.page - 1) * items_per_page
     end_idx = start_idx + items_per_page
 
+    # Only the rows on this page are read from the store
+    page_df = to_frame(store.page(search_term, filters, limit=items_per_page, offset=start_idx))
+
     # Display the paginated table with improved styling
     st.dataframe(
-        filtered_df.iloc[start_idx:end_idx],
+        page_df,
         column_config={
             "Company Name": st.column_config.TextColumn(width="medium"),
-            "Description": st.column_config.TextColumn(width="large")
+            "Website": st.column_config.LinkColumn(),
         },
         hide_index=True,
         use_container_width=True
     )
-    
+
     # Show item range info
-    st.caption(f"Showing items {start_idx+1}-{min(end_idx, len(filtered_df))} of {len(filtered_df)}")
-     
+    st.caption(f"Showing items {start_idx+1}-{min(end_idx, filtered_count)} of {filtered_count}")
+
     # Previous/Next arrows
     if total_pages > 1:
         prev_col, _, next_col = st.columns([1, 8, 1])
-        
+
         with prev_col:
-            if st.button("◀", disabled=(st.session_state.page == 1), 
+            if st.button("◀", disabled=(st.session_state.page == 1),
                         help="Previous page", key="prev_page"):
                 st.session_state.page = max(1, st.session_state.page - 1)
-        
+                st.rerun()
+
         with next_col:
-            if st.button("▶", disabled=(st.session_state.page == total_pages), 
+            if st.button("▶", disabled=(st.session_state.page == total_pages),
                         help="Next page", key="next_page"):
                 st.session_state.page = min(total_pages, st.session_state.page + 1)
-        
+                st.rerun()
+
+    # Export the current selection (built on request, not on every rerun)
+    if st.sidebar.button("Prepare CSV export", use_container_width=True):
+        st.session_state.directory_export = (selection, store.export_csv(search_term, filters))
+    export = st.session_state.get('directory_export')
+    if export and export[0] == selection:
+        st.sidebar.download_button("Download CSV", export[1], file_name="companies.csv",
+                                   mime="text/csv", use_container_width=True)
+    st.sidebar.divider()
+
     # Show database stats
-    
+
     st.sidebar.markdown(f"**Database Stats**")
-    st.sidebar.markdown(f"Total Companies: {len(company_df)}")
+    st.sidebar.markdown(f"Total Companies: {total_companies}")
+    st.sidebar.markdown(f"Categories: {len(category_counts)}")
     st.sidebar.divider()
 
-    # st.sidebar.markdown(f"Categories: {len(company_df['Main Category'].unique())}")
-
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
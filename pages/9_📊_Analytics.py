@@ -0,0 +1,78 @@
+import logging
+import time
+from datetime import date, timedelta
+import streamlit as st
+from helper_functions.historyanalytics import (
+    cache_hit_rate, compact_history, latency_percentiles, load_history, mode_mix,
+    start_compaction_scheduler, volume_by_day, volume_by_user_day
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ANALYTICS_COLUMNS = ["id", "date", "user_email", "mode", "cache_hit", "response_time", "first_token_time"]
+
+
+def format_seconds(value):
+    return "–" if value is None else f"{value:.2f}s"
+
+
+def main():
+    st.set_page_config(page_title="Query Analytics | Jeron.AI", layout="centered")
+    st.title("📊 Query Analytics")
+
+    scheduler = start_compaction_scheduler()
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected = st.date_input("Date range", value=(date.today() - timedelta(days=30), date.today()))
+        # While a range is being picked, only its first day is set
+        start, end = (tuple(selected) + (None,))[:2] if isinstance(selected, tuple) else (selected, selected)
+    with col2:
+        st.write("")
+        if st.button("Compact now", use_container_width=True):
+            with st.spinner("Compacting history..."):
+                st.toast(f"Compacted {compact_history()} new entries")
+    if scheduler.last_run:
+        st.caption(f"History last compacted {time.strftime('%H:%M:%S', time.localtime(scheduler.last_run))}")
+
+    load_started = time.perf_counter()
+    try:
+        history = load_history(start, end, columns=ANALYTICS_COLUMNS)
+    except Exception as e:
+        logger.error(f"Error loading analytics: {str(e)}")
+        st.error(f"Error loading analytics: {str(e)}")
+        return
+    if history.num_rows == 0:
+        st.info("No searches in this date range")
+        return
+
+    latency = latency_percentiles(history)
+    first_token = latency_percentiles(history, "first_token_time")
+    hit_rates = cache_hit_rate(history)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Searches", f"{history.num_rows:,}")
+    col2.metric("Response p50 / p95", f"{format_seconds(latency['p50'])} / {format_seconds(latency['p95'])}")
+    col3.metric("First token p50 / p95",
+                f"{format_seconds(first_token['p50'])} / {format_seconds(first_token['p95'])}")
+    col4.metric("Cache hit rate", f"{hit_rates['overall']:.0%}",
+                help=", ".join(f"{tier}: {rate:.0%}" for tier, rate in hit_rates.items() if tier != "overall"))
+
+    st.subheader("Searches per day")
+    st.bar_chart(volume_by_day(history).to_pandas(), x="date", y="queries")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Deep search vs RAG")
+        st.dataframe(mode_mix(history).to_pandas(), hide_index=True, use_container_width=True)
+    with col2:
+        st.subheader("Per user and day")
+        st.dataframe(volume_by_user_day(history).to_pandas(), hide_index=True, use_container_width=True)
+
+    st.caption(f"Aggregated {history.num_rows:,} searches in {time.perf_counter() - load_started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# helper_functions.llm falls back to st.secrets at import without a key; tests never call the API
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
@@ -0,0 +1,52 @@
+import pytest
+
+from logics import browserpool
+from logics.browserpool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    started = []
+
+    def new_driver():
+        driver = FakeDriver()
+        started.append(driver)
+        return driver
+
+    monkeypatch.setattr(browserpool, "new_headless_driver", new_driver)
+    return started
+
+
+def test_driver_that_raises_is_replaced(drivers):
+    with DriverPool(size=1) as pool:
+        with pytest.raises(RuntimeError):
+            with pool.driver() as driver:
+                crashed = driver
+                raise RuntimeError("session crashed")
+        with pool.driver() as driver:
+            assert driver is not crashed
+    assert crashed.quit_called
+    assert len(drivers) == 2
+
+
+def test_pool_without_browsers_fails_fast(drivers, monkeypatch, caplog):
+    def broken_driver():
+        raise OSError("no chrome")
+
+    with DriverPool(size=1) as pool:
+        monkeypatch.setattr(browserpool, "new_headless_driver", broken_driver)
+        with pytest.raises(RuntimeError):
+            with pool.driver():
+                raise RuntimeError("session crashed")
+        assert "pool is down to 0/1 browsers" in caplog.text
+        with pytest.raises(RuntimeError, match="no browsers left"):
+            with pool.driver():
+                pass
@@ -0,0 +1,87 @@
+import pytest
+
+from logics.companystore import CompanyStore, company_id, companies_from_index
+
+
+def scraped(i, **overrides):
+    """A record shaped like extract_company_details output plus the crawl fields"""
+    company = {
+        'company_name': f"Company {i}",
+        'website_url': None,
+        'contact_person': None,
+        'contact_number': "+65 6123 4567",
+        'contact_email': f"hello{i}@example.com",
+        'category': "Data & AI" if i % 2 else "Cloud",
+        'subcategory': None,
+        'description': "",
+        'tags': ["analytics", "retail"] if i % 3 == 0 else ["analytics"],
+        'source_url': f"https://directory.example/company-{i}",
+        'page_scraped': 1 + i // 10,
+    }
+    company.update(overrides)
+    return company
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CompanyStore(str(tmp_path / "companies.sqlite3"), manifest_path=None)
+
+
+def test_all_companies_round_trips_scraped_records(store):
+    companies = [scraped(i) for i in range(5)]
+    store.sync(companies)
+    by_url = {c['source_url']: c for c in store.all_companies()}
+    # None must stay None, or the rebuilt index text differs and everything is re-embedded
+    assert [by_url[c['source_url']] for c in companies] == companies
+
+
+def test_sync_reports_changes_and_removals(store):
+    companies = [scraped(i) for i in range(10)]
+    store.sync(companies)
+    companies[0] = scraped(0, description="Now with a description")
+    stats = store.sync(companies[:9])
+    assert stats == {'new': 0, 'changed': 1, 'unchanged': 8, 'removed': 1}
+    assert store.count() == 9
+
+
+def test_sync_refuses_to_remove_most_companies(store):
+    store.sync([scraped(i) for i in range(10)])
+    with pytest.raises(ValueError):
+        store.sync([scraped(i) for i in range(3)])
+    assert store.count() == 10
+
+
+def test_queries_filter_and_count_by_facet(store):
+    store.sync([scraped(i) for i in range(12)])
+    assert store.count("company 1") == 3   # 1, 10, 11
+    assert store.count(filters={'tags': ["retail"]}) == 4
+    facets = store.facet_counts({'category': "Cloud"})
+    assert facets['category'] == {"Cloud": 6, "Data & AI": 6}
+    assert facets['tags'] == {"analytics": 6, "retail": 2}
+    page = store.page(limit=5, offset=5)
+    assert [row['company_name'] for row in page] == [f"Company {i}" for i in (3, 4, 5, 6, 7)]
+
+
+def test_companies_are_recovered_from_index_chunks(store):
+    company = scraped(3, website_url="https://acme.example",
+                      description="Dashboards and forecasting for retailers across the region.")
+    cid = company_id(company)
+    metadata = {'company_id': cid, 'source': company['source_url'], 'name': company['company_name'],
+                'category': company['category'], 'subcategory': '', 'contact': '',
+                'website': company['website_url'], 'page': 1, 'tags': "analytics, retail"}
+    header = f"Company: {company['company_name']}"
+    chunks = [
+        (f"{cid}:description:1", "description", f"{header}\nDescription: for retailers across the region."),
+        (f"{cid}:profile:0", "profile", f"{header}\nWebsite: https://acme.example"),
+        (f"{cid}:description:0", "description", f"{header}\nDescription: Dashboards and forecasting for"),
+    ]
+    ids = [doc_id for doc_id, _, _ in chunks]
+    metadatas = [dict(metadata, field=field) for _, field, _ in chunks]
+    documents = [text for _, _, text in chunks]
+
+    recovered = companies_from_index(ids, metadatas, documents)
+
+    # Everything but the contact number and email, which the index does not keep
+    assert recovered == [dict(company, contact_number=None, contact_email=None, page_scraped=1)]
+    store.sync(recovered)
+    assert store.count() == 1
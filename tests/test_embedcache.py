@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from helper_functions import embedcache
+from helper_functions.embedcache import EmbeddingCache
+
+MODEL = "test-model"
+VECTOR_BYTES = 4 * 4    # four float32 values
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # Every call gets a later timestamp, so the LRU order is deterministic
+    clock = itertools.count(1)
+    monkeypatch.setattr(embedcache.time, "time", lambda: float(next(clock)))
+    return EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_bytes=3 * VECTOR_BYTES)
+
+
+def vector(i):
+    return [float(i)] * 4
+
+
+def test_least_recently_used_vector_is_evicted(cache):
+    for i, text in enumerate(["a", "b", "c"]):
+        cache.put_many(MODEL, [text], [vector(i)])
+    assert cache.get_many(MODEL, ["a"]) == [vector(0)]    # "b" is now the oldest
+
+    cache.put_many(MODEL, ["d"], [vector(3)])
+
+    assert cache.get_many(MODEL, ["a", "b", "c", "d"]) == [vector(0), None, vector(2), vector(3)]
+    assert cache.stats()["bytes"] == 3 * VECTOR_BYTES
+    assert cache.stats()["entries"] == 3
+
+
+def test_replacing_a_vector_does_not_count_its_size_twice(cache):
+    cache.put_many(MODEL, ["a", "b", "c"], [vector(0), vector(1), vector(2)])
+    cache.put_many(MODEL, ["a"], [vector(9)])
+    assert cache.stats()["entries"] == 3
+    assert cache.get_many(MODEL, ["a", "b"]) == [vector(9), vector(1)]
+
+
+def test_embed_only_calls_through_for_missing_texts(cache):
+    calls = []
+
+    def embed_fn(texts):
+        calls.append(list(texts))
+        return [vector(len(t)) for t in texts]
+
+    cache.embed(MODEL, ["x", "yy"], embed_fn)
+    assert cache.embed(MODEL, ["yy", "zzz", "zzz"], embed_fn) == [vector(2), vector(3), vector(3)]
+    assert calls == [["x", "yy"], ["zzz"]]
@@ -0,0 +1,36 @@
+import pytest
+
+from logics.filters import build_where, matches, tag_key
+
+ACME = {'category': "Data & AI", 'subcategory': "Analytics", 'tags': "analytics, retail",
+        tag_key("analytics"): True, tag_key("retail"): True}
+
+
+def test_tag_key_slugs_the_tag():
+    assert tag_key("Machine Learning / AI") == "tag:machine-learning-ai"
+
+
+def test_empty_filters_select_everything():
+    assert build_where(None) is None
+    assert build_where({'category': "", 'tags': []}) is None
+    assert matches(ACME, {'category': None, 'tags': []})
+
+
+def test_build_where_combines_fields_and_ors_tags():
+    assert build_where({'category': "Data & AI"}) == {'category': {"$eq": "Data & AI"}}
+    assert build_where({'category': "Data & AI", 'tags': ["retail", "analytics"]}) == {"$and": [
+        {'category': {"$eq": "Data & AI"}},
+        {"$or": [{"tag:analytics": {"$eq": True}}, {"tag:retail": {"$eq": True}}]},
+    ]}
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({'category': "Data & AI"}, True),
+    ({'category': "Cloud"}, False),
+    ({'subcategory': "Analytics", 'tags': ["retail"]}, True),
+    ({'tags': ["healthcare", "retail"]}, True),
+    ({'tags': ["healthcare"]}, False),
+    ({'category': "Data & AI", 'tags': ["healthcare"]}, False),
+])
+def test_matches_agrees_with_build_where(filters, expected):
+    assert matches(ACME, filters) is expected
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from helper_functions.historyanalytics import compact_history, load_history
+from helper_functions.historystore import QueryHistoryStore
+
+START = datetime(2026, 1, 1, 9, 0, 0)
+
+
+def test_deleted_entries_drop_out_of_compacted_history(tmp_path):
+    db_path, root = str(tmp_path / "history.sqlite3"), str(tmp_path / "parquet")
+    store = QueryHistoryStore(db_path, legacy_csv=None)
+    store.insert_many([
+        {'timestamp': START + timedelta(hours=i), 'user_email': "a@example.com", 'query': f"query {i}"}
+        for i in range(4)
+    ])
+    assert compact_history(db_path, root) == 4
+    ids = sorted(load_history(root=root, db_path=db_path)["id"].to_pylist())
+
+    # One already compacted to Parquet, then one more written after the compaction
+    assert store.delete(ids[0], "a@example.com")
+    assert not store.delete(ids[1], "b@example.com")
+    store.insert_many([{'timestamp': START + timedelta(days=1), 'user_email': "a@example.com", 'query': "late"}])
+
+    remaining = load_history(start=START.date(), root=root, db_path=db_path)["id"].to_pylist()
+    assert ids[0] not in remaining
+    assert len(remaining) == 4
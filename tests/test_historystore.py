@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from helper_functions.historystore import QueryHistoryStore
+
+START = datetime(2026, 1, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return QueryHistoryStore(str(tmp_path / "history.sqlite3"), legacy_csv=None)
+
+
+def add_entries(store, user_email, count, same_timestamp_every=1):
+    store.insert_many([
+        {'timestamp': START + timedelta(seconds=i // same_timestamp_every), 'user_email': user_email,
+         'query': f"query {i}", 'response': f"answer {i}"}
+        for i in range(count)
+    ])
+
+
+def test_pages_cover_every_entry_once_newest_first(store):
+    # Pairs of entries share a timestamp, so the id tie-break is exercised
+    add_entries(store, "a@example.com", 45, same_timestamp_every=2)
+    add_entries(store, "b@example.com", 5)
+
+    seen, after = [], None
+    while True:
+        rows, after = store.user_page("a@example.com", page_size=10, after=after)
+        seen.extend(rows)
+        if after is None:
+            break
+    assert len(seen) == store.user_count("a@example.com") == 45
+    assert len({row['id'] for row in seen}) == 45
+    keys = [(row['timestamp'], row['id']) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert {row['user_email'] for row in seen} == {"a@example.com"}
+
+
+def test_later_pages_seek_in_the_index(store):
+    sql, params = store._user_page_query("a@example.com", 10, (START.isoformat(), 5))
+    plan = " ".join(row[-1] for row in store._conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert "idx_history_user_time (user_email=? AND timestamp<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_delete_is_owner_only_and_leaves_a_tombstone(store):
+    add_entries(store, "a@example.com", 2)
+    rows, _ = store.user_page("a@example.com")
+    entry_id = rows[0]['id']
+
+    assert not store.delete(entry_id, "b@example.com")
+    assert store.delete(entry_id, "a@example.com")
+    assert store.user_count("a@example.com") == 1
+    assert [row[0] for row in store._conn.execute("SELECT id FROM deleted_history")] == [entry_id]
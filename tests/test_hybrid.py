@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from logics.hybrid import rrf_fuse
+
+
+def test_ids_ranked_by_both_retrievers_come_first():
+    vector = ["a", "b", "c"]
+    lexical = ["c", "a"]
+    assert rrf_fuse([vector, lexical]) == ["a", "c", "b"]
+
+
+def test_ties_keep_first_seen_order():
+    assert rrf_fuse([["a"], ["b"]]) == ["a", "b"]
+    assert rrf_fuse([]) == []
+
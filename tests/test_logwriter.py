@@ -0,0 +1,66 @@
+import os
+import time
+
+import pytest
+
+from helper_functions.logwriter import RotatingCsvLog, segment_label
+
+FIELDS = ['timestamp', 'query']
+
+
+@pytest.fixture
+def make_log(tmp_path):
+    logs = []
+
+    def make(**kwargs):
+        # A long interval keeps the background thread out of the way; the tests flush
+        log = RotatingCsvLog(str(tmp_path / "queries.csv"), FIELDS, flush_interval=60, **kwargs)
+        logs.append(log)
+        return log
+
+    yield make
+    for log in logs:
+        log.close()
+
+
+def write(log, *queries):
+    for query in queries:
+        log.append({'timestamp': "2026-01-01T09:00:00", 'query': query})
+    log.flush()
+
+
+def test_rotates_once_the_active_file_is_full(make_log):
+    log = make_log(max_bytes=1)
+    write(log, "first")
+    write(log, "second")
+    write(log, "third")
+
+    segments = log.segments()
+    assert len(segments) == 3
+    assert segment_label(segments[0]) is None
+    assert all(segment_label(s) for s in segments[1:])
+    # Every segment starts with its own header, and rows read back newest first
+    assert [row['query'] for row in log.iter_rows()] == ["third", "second", "first"]
+    assert [row['query'] for row in log.iter_rows(newest_first=False)] == ["first", "second", "third"]
+    assert log.read_page(page=1, page_size=2) == [{'timestamp': "2026-01-01T09:00:00", 'query': "first"}]
+
+
+def test_small_file_rotates_on_a_new_day(make_log):
+    log = make_log(max_bytes=1024 * 1024)
+    write(log, "day 1 a")
+    write(log, "day 1 b")
+    assert len(log.segments()) == 1
+
+    yesterday = time.time() - 24 * 60 * 60
+    os.utime(log.path, (yesterday, yesterday))
+    write(log, "day 2")
+
+    assert len(log.segments()) == 2
+    assert [row['query'] for row in log.iter_rows()] == ["day 2", "day 1 b", "day 1 a"]
+
+
+def test_close_writes_queued_rows(make_log):
+    log = make_log()
+    log.append({'timestamp': "2026-01-01T09:00:00", 'query': "queued"})
+    log.close()
+    assert [row['query'] for row in log.iter_rows()] == ["queued"]
@@ -0,0 +1,41 @@
+from logics.manifest import CrawlManifest, company_hash, content_hash
+
+URL = "https://directory.example/acme"
+COMPANY = {'company_name': "Acme Analytics", 'description': "Dashboards.", 'tags': ["analytics"],
+           'source_url': URL, 'page_scraped': 1}
+
+
+def test_company_hash_ignores_crawl_fields():
+    moved = dict(COMPANY, page_scraped=4, source_url=URL + "?page=4")
+    edited = dict(COMPANY, description="Dashboards and forecasts.")
+    assert company_hash(moved) == company_hash(COMPANY)
+    assert company_hash(edited) != company_hash(COMPANY)
+
+
+def test_saved_manifest_detects_unchanged_and_changed_pages(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = CrawlManifest(path)
+    assert manifest.conditional_headers(URL) == {}
+    manifest.update(URL, COMPANY, content_hash("<html>v1</html>"), etag='"v1"',
+                    last_modified="Wed, 01 Jan 2026 00:00:00 GMT")
+    manifest.save()
+
+    reloaded = CrawlManifest(path)
+    entry = reloaded.get(URL)
+    assert reloaded.urls() == [URL]
+    assert entry['company'] == COMPANY
+    assert reloaded.conditional_headers(URL) == {'If-None-Match': '"v1"',
+                                                 'If-Modified-Since': "Wed, 01 Jan 2026 00:00:00 GMT"}
+    # Same body: nothing to re-parse; new body: the stored hashes no longer match
+    assert entry['body_hash'] == content_hash("<html>v1</html>")
+    assert entry['body_hash'] != content_hash("<html>v2</html>")
+    assert entry['content_hash'] == company_hash(dict(COMPANY, page_scraped=2))
+
+    reloaded.remove(URL)
+    assert reloaded.get(URL) is None
+
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{truncated", encoding='utf-8')
+    assert CrawlManifest(str(path)).urls() == []
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("pytz")
+
+from helper_functions import query
+from helper_functions.query import QueryHistoryWriter
+
+
+class StalledStore:
+    """Records batches; writes from the background thread wait until released"""
+
+    def __init__(self):
+        self.batches = []
+        self.writer_busy = threading.Event()
+        self.release = threading.Event()
+
+    def insert_many(self, entries):
+        if threading.current_thread().name == "query-history-writer":
+            self.writer_busy.set()
+            assert self.release.wait(5)
+        self.batches.append([entry['query'] for entry in entries])
+
+
+def test_full_queue_writes_the_entry_synchronously(monkeypatch):
+    monkeypatch.setattr(query, "HISTORY_PUT_TIMEOUT", 0.01)
+    store = StalledStore()
+    writer = QueryHistoryWriter(store=store, maxsize=1, flush_interval=0.05)
+    try:
+        writer.submit({'query': "first"})
+        assert store.writer_busy.wait(5)    # the writer thread is stuck on "first"
+        writer.submit({'query': "second"})  # fills the queue
+        writer.submit({'query': "third"})   # no room: written by the caller
+
+        assert store.batches == [["third"]]
+
+        store.release.set()
+        writer.flush()
+        assert sorted(q for batch in store.batches for q in batch) == ["first", "second", "third"]
+    finally:
+        store.release.set()
+        writer.close()
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("langchain_community")
+
+from langchain_community.vectorstores import Chroma
+
+from benchmarks.fakes import FakeEmbeddings
+from logics.filters import build_where
+from logics.vectordb import build_company_document, sync_collection
+
+COMPANY = {
+    'company_name': "Acme Analytics",
+    'website_url': "https://acme.example",
+    'contact_person': "Jo Tan",
+    'category': "Data & AI",
+    'subcategory': "Analytics",
+    'description': "Dashboards and forecasting for retailers.",
+    'tags': ["analytics", "retail"],
+    'source_url': "https://directory.example/acme",
+    'page_scraped': 1,
+}
+
+
+@pytest.fixture
+def collection(tmp_path):
+    embeddings = FakeEmbeddings()
+    return Chroma(persist_directory=str(tmp_path), collection_name="test", embedding_function=embeddings), embeddings
+
+
+def test_unchanged_company_in_old_layout_is_rechunked(collection):
+    vectordb, embeddings = collection
+    # Pre field-chunking layout: one whole-company document, same content hash
+    doc_text, metadata = build_company_document(COMPANY)
+    legacy_id = f"{metadata['company_id']}:0"
+    vectordb._collection.add(ids=[legacy_id], documents=[doc_text], metadatas=[metadata],
+                             embeddings=embeddings.embed_documents([doc_text]))
+
+    stats, _ = sync_collection(vectordb, [COMPANY], embeddings.embed_documents)
+
+    assert stats['unchanged'] == 0
+    assert stats['embedded_documents'] == 3
+    stored = vectordb._collection.get(include=["metadatas"])
+    assert legacy_id not in stored["ids"]
+    assert sorted(m['field'] for m in stored["metadatas"]) == ['description', 'labels', 'profile']
+
+    # Once migrated, the same content is skipped
+    stats, _ = sync_collection(vectordb, [COMPANY], embeddings.embed_documents)
+    assert stats['unchanged'] == 1
+    assert stats['embedded_documents'] == 0
+
+
+def test_removed_tag_no_longer_matches_reused_chunks(collection):
+    vectordb, embeddings = collection
+    sync_collection(vectordb, [COMPANY], embeddings.embed_documents)
+    retagged = dict(COMPANY, tags=["analytics"])
+
+    stats, _ = sync_collection(vectordb, [retagged], embeddings.embed_documents)
+
+    # Only the labels chunk has new text; profile and description are reused
+    assert stats['embedded_documents'] == 1
+    assert stats['updated_documents'] == 2
+    assert vectordb._collection.get(where=build_where({'tags': ["retail"]}))["ids"] == []
+    still_tagged = vectordb._collection.get(where=build_where({'tags': ["analytics"]}), include=["metadatas"])
+    assert sorted(m['field'] for m in still_tagged["metadatas"]) == ['description', 'labels', 'profile']